@@ -4,12 +4,14 @@ from deepagents.backends.composite import CompositeBackend
 from deepagents.backends.filesystem import FilesystemBackend
 from deepagents.backends.state import StateBackend
 from deepagents.backends.store import StoreBackend
-from deepagents.backends.protocol import BackendProtocol
+from deepagents.backends.protocol import BackendProtocol, GrepSummaryBackendProtocol, LsPathsBackendProtocol
 
 __all__ = [
     "BackendProtocol",
     "CompositeBackend",
     "FilesystemBackend",
+    "GrepSummaryBackendProtocol",
+    "LsPathsBackendProtocol",
     "StateBackend",
     "StoreBackend",
 ]
@@ -8,6 +8,8 @@ from deepagents.backends.utils import FileInfo, GrepMatch
 
 
 class CompositeBackend:
+
+    __slots__ = ("default", "routes", "sorted_routes")
     
     def __init__(
         self,
@@ -7,23 +7,267 @@ Security and search upgrades:
   and optional glob include filtering, while preserving virtual path behavior
 """
 
+import contextlib
+import errno
+import functools
+import json
+import mmap
+import operator
 import os
 import re
-import json
+import shutil
+import stat
 import subprocess
+import tempfile
+import threading
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import accumulate, count, islice
 from pathlib import Path
-from typing import Optional
+from typing import IO, Any, Optional, TypeVar
+
+import wcmatch.glob as wcglob
+
+from deepagents.backends.protocol import EditResult, WriteResult
+from deepagents.backends.utils import FileInfo, GrepMatch
 
 from .utils import (
+    _EXTRA_LINE_BREAKS,
+    _required_literal,
     check_empty_content,
+    compile_glob,
+    compile_regex,
     format_content_with_line_numbers,
     perform_string_replacement,
 )
-import wcmatch.glob as wcglob
-from deepagents.backends.utils import FileInfo, GrepMatch
-from deepagents.backends.protocol import WriteResult, EditResult
 
+_T = TypeVar("_T")
+
+_json_loads: Callable[[bytes | str], Any]
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# Upper bound on worker threads for batched, I/O-bound file operations
+_MAX_IO_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+
+# ripgrep is killed after this long and the Python fallback is used instead
+_RIPGREP_TIMEOUT_SECONDS = 30
+# Stop consuming rg --json output past this many bytes
+_RIPGREP_MAX_OUTPUT_BYTES = 16 * 1024 * 1024
+
+# Number of (root, include glob) file enumerations kept for the Python grep fallback
+_FILE_INDEX_MAX_ENTRIES = 32
+
+# Files whose first block contains a NUL byte are treated as binary
+_BINARY_SNIFF_BYTES = 8192
+# Files at least this large are memory-mapped when probing for a literal
+_MMAP_MIN_BYTES = 64 * 1024
+# Files at least this large get a cached line index when read at an offset
+_LINE_INDEX_MIN_BYTES = 1024 * 1024
+# Upper bound on files with a cached line index per backend
+_LINE_INDEX_MAX_ENTRIES = 8
+# Upper bound on cached grep results per backend
+_GREP_CACHE_MAX_ENTRIES = 64
+# Extensions that are never worth opening as text
+_BINARY_EXTENSIONS = frozenset({
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".pdf", ".zip", ".gz", ".tar",
+    ".so", ".dylib", ".dll", ".pyc", ".o", ".a", ".wasm", ".mp4", ".mp3", ".mov",
+})
+
+# Anchors and lookarounds whose meaning differs between a single line and a
+# whole buffer: a lookaround at a line edge sees the neighbouring line's text
+_BUFFER_UNSAFE_ASSERTIONS = ("\\A", "\\Z", "(?=", "(?!", "(?<=", "(?<!")
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """Write all of data to a raw file descriptor, bypassing Python's buffered IO."""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _replace_file(path: Path, data: bytes, mode: int) -> None:
+    """Atomically replace path with data via a sibling temp file and Path.replace.
+
+    The temp file gets the permission bits of mode, so the replacement keeps
+    the original file's permissions. A rename would turn a symlink into a
+    regular file, split a hard link and reset the owner, so symlinks are
+    refused and hard-linked or foreign-owned files are rewritten in place.
+    """
+    st = path.lstat()
+    if stat.S_ISLNK(st.st_mode) or not stat.S_ISREG(st.st_mode):
+        raise OSError(errno.ELOOP, "Refusing to replace a symlink or non-regular file", str(path))
+    if st.st_nlink > 1 or st.st_uid != os.geteuid():
+        fd = os.open(path, os.O_WRONLY | os.O_TRUNC | getattr(os, "O_NOFOLLOW", 0))
+        try:
+            _write_all(fd, data)
+        finally:
+            os.close(fd)
+        return
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        try:
+            os.fchmod(fd, stat.S_IMODE(mode))
+            _write_all(fd, data)
+        finally:
+            os.close(fd)
+        Path(tmp).replace(path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            Path(tmp).unlink()
+        raise
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_mtime(mtime: float) -> str:
+    """Format an st_mtime as a local ISO timestamp.
+
+    Files in a checkout or generated tree often share mtimes, so listings
+    repeat the same handful of values.
+    """
+    return datetime.fromtimestamp(mtime).isoformat()  # noqa: DTZ006  # listings report local time
+
+
+def _walk_entries(top: str, dir_mtimes: Optional[dict[str, int]] = None) -> Iterator[os.DirEntry[str]]:
+    """Yield every non-directory entry below top, depth first.
+
+    Uses os.scandir so entry types come from the directory read itself
+    rather than a stat() per path. Like Path.rglob, symlinked directories
+    are not descended into; unreadable directories are skipped.
+
+    If dir_mtimes is given, it is filled with the st_mtime_ns of every
+    directory visited, taken before the directory is listed.
+    """
+    stack = [top]
+    while stack:
+        dir_path = stack.pop()
+        try:
+            if dir_mtimes is not None:
+                dir_mtimes[dir_path] = os.stat(dir_path).st_mtime_ns  # noqa: PTH116  # str paths, no Path per directory
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    continue
+            except OSError:
+                continue
+            yield entry
+
+
+def _stat_fingerprint(paths: Iterable[str]) -> tuple[Optional[tuple[int, int, int]], ...]:
+    """Return (st_ino, st_size, st_mtime_ns) per path; None where stat fails."""
+    fingerprint: list[Optional[tuple[int, int, int]]] = []
+    for fp in paths:
+        try:
+            st = os.stat(fp)  # noqa: PTH116  # str paths, no Path per file
+        except OSError:
+            fingerprint.append(None)
+            continue
+        fingerprint.append((st.st_ino, st.st_size, st.st_mtime_ns))
+    return tuple(fingerprint)
+
+
+def _dirs_unchanged(dir_mtimes: dict[str, int]) -> bool:
+    """Return True if none of the directories has been modified since it was recorded."""
+    try:
+        return all(os.stat(d).st_mtime_ns == mtime for d, mtime in dir_mtimes.items())  # noqa: PTH116  # str paths, no Path per directory
+    except OSError:
+        return False
+
+
+def _scan_file(
+    regex: re.Pattern[str], fp: str, max_bytes: int, needle: Optional[bytes] = None, *, first_only: bool = False
+) -> list[tuple[int, str]]:
+    """Search a single text file, returning its matching lines.
+
+    Files larger than max_bytes, unreadable, binary (a NUL byte in the first
+    _BINARY_SNIFF_BYTES, as ripgrep decides) or not valid UTF-8 yield no
+    matches. If needle is given, files whose bytes do not contain it are
+    rejected without being decoded. With first_only, scanning stops at the
+    first matching line.
+    """
+    try:
+        with open(fp, "rb") as f:  # noqa: PTH123  # str paths, no Path per file
+            size = os.fstat(f.fileno()).st_size
+            if size > max_bytes:
+                return []
+            if needle is not None and size >= _MMAP_MIN_BYTES:
+                # Probe large files through the page cache; only files that
+                # contain the needle are copied into memory.
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if b"\x00" in mm[:_BINARY_SNIFF_BYTES] or mm.find(needle) == -1:
+                        return []
+                    data = mm[:]
+            else:
+                head = f.read(_BINARY_SNIFF_BYTES)
+                if b"\x00" in head:
+                    return []
+                data = head + f.read()
+                if needle is not None and needle not in data:
+                    return []
+        content = data.decode("utf-8")
+    except (UnicodeDecodeError, OSError, ValueError):
+        return []
+    if "\r" in content:
+        # Same newline translation as reading in text mode
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return _search_lines(regex, content, first_only=first_only)
+
+
+def _search_lines(regex: re.Pattern[str], content: str, *, first_only: bool = False) -> list[tuple[int, str]]:
+    r"""Return (line_number, line) for every line of content that regex matches.
+
+    Rather than calling regex.search() once per line from Python, the pattern
+    is run over the whole buffer in MULTILINE mode so the scan between hits
+    happens inside the regex engine. Each hit is re-checked against its own
+    line, and the scan resumes at the next line, so results match a per-line
+    search exactly. Patterns with assertions that would see past the line's
+    edges in the buffer, and content with line breaks other than "\n", are
+    searched line by line instead. With first_only, at most the first
+    matching line is returned.
+    """
+    if any(assertion in regex.pattern for assertion in _BUFFER_UNSAFE_ASSERTIONS) or any(
+        sep in content for sep in _EXTRA_LINE_BREAKS
+    ):
+        hits = ((line_num, line) for line_num, line in enumerate(content.splitlines(), 1) if regex.search(line))
+        return list(islice(hits, 1)) if first_only else list(hits)
+
+    buffer_regex = re.compile(regex.pattern, regex.flags | re.MULTILINE)
+    matches: list[tuple[int, str]] = []
+    size = len(content)
+    line_num = 1
+    line_start = 0
+    pos = 0
+    while pos <= size:
+        m = buffer_regex.search(content, pos)
+        if m is None:
+            break
+        start = m.start()
+        if start == size and (size == 0 or content[-1] == "\n"):
+            # Empty match past the final newline: there is no line here
+            break
+        line_num += content.count("\n", line_start, start)
+        line_start = content.rfind("\n", 0, start) + 1
+        line_end = content.find("\n", start)
+        if line_end == -1:
+            line_end = size
+        line = content[line_start:line_end]
+        if regex.search(line):
+            matches.append((line_num, line))
+            if first_only:
+                break
+        pos = line_end + 1
+    return matches
 
 
 class FilesystemBackend:
@@ -34,6 +278,18 @@ class FilesystemBackend:
     as plain text, and metadata (timestamps) are derived from filesystem stats.
     """
 
+    __slots__ = (
+        "_cwd_prefix",
+        "_file_index",
+        "_grep_cache",
+        "_line_index",
+        "_line_index_lock",
+        "_rg_path",
+        "cwd",
+        "max_file_size_bytes",
+        "virtual_mode",
+    )
+
     def __init__(
         self, 
         root_dir: Optional[str | Path] = None,
@@ -50,6 +306,22 @@ class FilesystemBackend:
         self.cwd = Path(root_dir).resolve() if root_dir else Path.cwd()
         self.virtual_mode = virtual_mode
         self.max_file_size_bytes = max_file_size_mb * 1024 * 1024
+        # String prefix of the resolved root, for cheap virtual path mapping
+        self._cwd_prefix = str(self.cwd).rstrip("/") + "/"
+        # Resolved once so grep neither walks PATH per call nor keeps retrying
+        # a missing ripgrep
+        self._rg_path: Optional[str] = shutil.which("rg")
+        # (root, include_glob) -> (directory mtimes, grep candidates); reused by
+        # the Python grep fallback while no directory in the walk has changed
+        self._file_index: dict[tuple[str, Optional[str]], tuple[dict[str, int], list[tuple[str, str]]]] = {}
+        # (st_dev, st_ino) -> ((size, mtime_ns), line start offsets, line
+        # count) for large files read at an offset; None offsets if unusable
+        self._line_index: dict[tuple[int, int], tuple[tuple[int, int], Optional[array], int]] = {}
+        # read_many reads on a thread pool, so index updates are serialized
+        self._line_index_lock = threading.Lock()
+        # (mode, pattern, include_glob, search path) -> (candidates, stat
+        # fingerprint, result), least recently used first
+        self._grep_cache: dict[tuple[str, str, Optional[str], str], tuple[list[tuple[str, str]], tuple, Any]] = {}
 
     def _resolve_path(self, key: str) -> Path:
         """Resolve a file path with security checks.
@@ -70,10 +342,11 @@ class FilesystemBackend:
             if ".." in vpath or vpath.startswith("~"):
                 raise ValueError("Path traversal not allowed")
             full = (self.cwd / vpath.lstrip("/")).resolve()
-            try:
-                full.relative_to(self.cwd)
-            except ValueError:
-                raise ValueError(f"Path:{full} outside root directory: {self.cwd}") from None
+            # Containment via the cached root prefix rather than a
+            # component-wise relative_to()
+            full_str = str(full)
+            if full_str != self._cwd_prefix[:-1] and not full_str.startswith(self._cwd_prefix):
+                raise ValueError(f"Path:{full} outside root directory: {self.cwd}")
             return full
 
         path = Path(key)
@@ -81,6 +354,15 @@ class FilesystemBackend:
             return path
         return (self.cwd / path).resolve()
 
+    def _to_virtual_path(self, abs_path: str) -> Optional[str]:
+        """Map an already-resolved absolute path under cwd to its virtual path.
+
+        Returns None if the path is not under cwd.
+        """
+        if not abs_path.startswith(self._cwd_prefix):
+            return None
+        return "/" + abs_path[len(self._cwd_prefix):]
+
     def ls_info(self, path: str) -> list[FileInfo]:
         """List files and directories in the specified directory (non-recursive).
 
@@ -92,88 +374,42 @@ class FilesystemBackend:
             Directories have a trailing / in their path and is_dir=True.
         """
         dir_path = self._resolve_path(path)
-        if not dir_path.exists() or not dir_path.is_dir():
-            return []
-
         results: list[FileInfo] = []
 
-        # Convert cwd to string for comparison
-        cwd_str = str(self.cwd)
-        if not cwd_str.endswith("/"):
-            cwd_str += "/"
-
-        # List only direct children (non-recursive)
+        # List only direct children (non-recursive). A missing path or a file
+        # surfaces as OSError from scandir, so no separate exists()/is_dir()
+        # stats are needed. A single stat() per entry yields type, size and
+        # mtime; is_file()/is_dir() would each stat again.
         try:
-            for child_path in dir_path.iterdir():
-                try:
-                    is_file = child_path.is_file()
-                    is_dir = child_path.is_dir()
-                except OSError:
-                    continue
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    is_file = stat.S_ISREG(st.st_mode)
+                    if not is_file and not stat.S_ISDIR(st.st_mode):
+                        continue
 
-                abs_path = str(child_path)
+                    entry_path = (self._to_virtual_path(entry.path) or entry.path) if self.virtual_mode else entry.path
 
-                if not self.virtual_mode:
-                    # Non-virtual mode: use absolute paths
+                    modified_at = _format_mtime(st.st_mtime)
                     if is_file:
-                        try:
-                            st = child_path.stat()
-                            results.append({
-                                "path": abs_path,
-                                "is_dir": False,
-                                "size": int(st.st_size),
-                                "modified_at": datetime.fromtimestamp(st.st_mtime).isoformat(),
-                            })
-                        except OSError:
-                            results.append({"path": abs_path, "is_dir": False})
-                    elif is_dir:
-                        try:
-                            st = child_path.stat()
-                            results.append({
-                                "path": abs_path + "/",
-                                "is_dir": True,
-                                "size": 0,
-                                "modified_at": datetime.fromtimestamp(st.st_mtime).isoformat(),
-                            })
-                        except OSError:
-                            results.append({"path": abs_path + "/", "is_dir": True})
-                else:
-                    # Virtual mode: strip cwd prefix
-                    if abs_path.startswith(cwd_str):
-                        relative_path = abs_path[len(cwd_str):]
-                    elif abs_path.startswith(str(self.cwd)):
-                        # Handle case where cwd doesn't end with /
-                        relative_path = abs_path[len(str(self.cwd)):].lstrip("/")
+                        results.append({
+                            "path": entry_path,
+                            "is_dir": False,
+                            "size": int(st.st_size),
+                            "modified_at": modified_at,
+                        })
                     else:
-                        # Path is outside cwd, return as-is or skip
-                        relative_path = abs_path
-
-                    virt_path = "/" + relative_path
-
-                    if is_file:
-                        try:
-                            st = child_path.stat()
-                            results.append({
-                                "path": virt_path,
-                                "is_dir": False,
-                                "size": int(st.st_size),
-                                "modified_at": datetime.fromtimestamp(st.st_mtime).isoformat(),
-                            })
-                        except OSError:
-                            results.append({"path": virt_path, "is_dir": False})
-                    elif is_dir:
-                        try:
-                            st = child_path.stat()
-                            results.append({
-                                "path": virt_path + "/",
-                                "is_dir": True,
-                                "size": 0,
-                                "modified_at": datetime.fromtimestamp(st.st_mtime).isoformat(),
-                            })
-                        except OSError:
-                            results.append({"path": virt_path + "/", "is_dir": True})
-        except (OSError, PermissionError):
-            pass
+                        results.append({
+                            "path": entry_path + "/",
+                            "is_dir": True,
+                            "size": 0,
+                            "modified_at": modified_at,
+                        })
+        except OSError:
+            return []
 
         # Keep deterministic order by path
         results.sort(key=lambda x: x.get("path", ""))
@@ -196,37 +432,130 @@ class FilesystemBackend:
             Formatted file content with line numbers, or error message.
         """
         resolved_path = self._resolve_path(file_path)
-        
-        if not resolved_path.exists() or not resolved_path.is_file():
-            return f"Error: File '{file_path}' not found"
-        
+        not_found = f"Error: File '{file_path}' not found"
+        # islice and the line index both need a non-negative window size
+        limit = max(limit, 0)
+
         try:
             # Open with O_NOFOLLOW where available to avoid symlink traversal
             try:
                 fd = os.open(resolved_path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
-                with os.fdopen(fd, "r", encoding="utf-8") as f:
-                    content = f.read()
             except OSError:
                 # Fallback to normal open if O_NOFOLLOW unsupported or fails
-                with open(resolved_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-            
-            empty_msg = check_empty_content(content)
-            if empty_msg:
-                return empty_msg
-            
-            lines = content.splitlines()
-            start_idx = offset
-            end_idx = min(start_idx + limit, len(lines))
-            
-            if start_idx >= len(lines):
-                return f"Error: Line offset {offset} exceeds file length ({len(lines)} lines)"
-            
-            selected_lines = lines[start_idx:end_idx]
-            return format_content_with_line_numbers(selected_lines, start_line=start_idx + 1)
+                fd = os.open(resolved_path, os.O_RDONLY)
+            try:
+                # Existence and type come from the opened fd rather than
+                # separate exists()/is_file() stats on the path
+                st = os.fstat(fd)
+                if not stat.S_ISREG(st.st_mode):
+                    return not_found
+
+                window = None
+                if offset > 0 and st.st_size >= _LINE_INDEX_MIN_BYTES:
+                    window = self._indexed_window(fd, st, offset, limit)
+                if window is not None:
+                    line_count, selected_lines = window
+                    skipped = min(offset, line_count)
+                    exhausted = offset + limit >= line_count
+                else:
+                    # Stream only the requested window; lines past offset +
+                    # limit are never read, and skipped lines are not kept.
+                    with os.fdopen(fd, "r", encoding="utf-8", closefd=False) as f:
+                        skipped = sum(1 for _ in islice(f, offset))
+                        selected_lines = [line.removesuffix("\n") for line in islice(f, limit)]
+                        exhausted = len(selected_lines) < limit or not f.readline()
+            finally:
+                os.close(fd)
+
+            if skipped == 0 and exhausted:
+                # The window is the whole file
+                empty_msg = check_empty_content("".join(selected_lines))
+                if empty_msg:
+                    return empty_msg
+
+            if not selected_lines:
+                if limit == 0 and not exhausted:
+                    # An empty window inside the file is an empty result
+                    return ""
+                return f"Error: Line offset {offset} exceeds file length ({skipped} lines)"
+
+            return format_content_with_line_numbers(selected_lines, start_line=offset + 1)
+        except FileNotFoundError:
+            return not_found
         except (OSError, UnicodeDecodeError) as e:
             return f"Error reading file '{file_path}': {e}"
     
+    def _indexed_window(
+        self, fd: int, st: os.stat_result, offset: int, limit: int
+    ) -> Optional[tuple[int, list[str]]]:
+        r"""Return (line count, lines [offset, offset + limit)) via a cached line index.
+
+        The first read of a large file records where every line starts; later
+        reads of the same unchanged file (same device, inode, size and mtime)
+        pread and decode only the bytes of the requested window, however deep
+        the offset. Returns None for files containing \r, whose text-mode
+        newline translation the byte index does not model.
+        """
+        key = (st.st_dev, st.st_ino)
+        fingerprint = (st.st_size, st.st_mtime_ns)
+        cached = self._line_index.get(key)
+        if cached is None or cached[0] != fingerprint:
+            with os.fdopen(fd, "rb", closefd=False) as f:
+                data = f.read()
+            # Rewind so a None result leaves the fd ready for read()'s
+            # streaming fallback
+            os.lseek(fd, 0, os.SEEK_SET)
+            if b"\r" in data:
+                starts = None
+                line_count = 0
+            else:
+                parts = data.split(b"\n")
+                # Line i starts after the i preceding lines and their newlines
+                starts = array("Q", map(operator.add, accumulate(map(len, parts), initial=0), count()))
+                line_count = len(parts) - (parts[-1] == b"")
+                del parts
+            cached = (fingerprint, starts, line_count)
+            with self._line_index_lock:
+                if len(self._line_index) >= _LINE_INDEX_MAX_ENTRIES:
+                    self._line_index.pop(next(iter(self._line_index)), None)
+                self._line_index[key] = cached
+
+        _, starts, line_count = cached
+        if starts is None:
+            return None
+        if offset >= line_count:
+            return line_count, []
+        start = starts[offset]
+        end = min(starts[min(offset + limit, line_count)], st.st_size)
+        lines = os.pread(fd, end - start, start).decode("utf-8").split("\n")
+        if lines[-1] == "":
+            lines.pop()
+        return line_count, lines
+
+    def read_many(
+        self,
+        file_paths: list[str],
+        offset: int = 0,
+        limit: int = 2000,
+    ) -> list[str]:
+        """Read several files concurrently.
+
+        Each file is read exactly as `read` would, on a thread pool so the
+        per-file open/read latency overlaps.
+
+        Args:
+            file_paths: Absolute or relative file paths
+            offset: Line offset to start reading from (0-indexed)
+            limit: Maximum number of lines to read per file
+
+        Returns:
+            Formatted contents or error messages, in the same order as file_paths.
+        """
+        if len(file_paths) <= 1:
+            return [self.read(p, offset=offset, limit=limit) for p in file_paths]
+        with ThreadPoolExecutor(max_workers=min(len(file_paths), _MAX_IO_WORKERS)) as pool:
+            return list(pool.map(lambda p: self.read(p, offset=offset, limit=limit), file_paths))
+
     def write(
         self, 
         file_path: str,
@@ -244,19 +573,26 @@ class FilesystemBackend:
             # Create parent directories if needed
             resolved_path.parent.mkdir(parents=True, exist_ok=True)
 
+            # Encode before creating the file so an encoding error leaves nothing behind
+            data = content.encode("utf-8")
+
             # Prefer O_NOFOLLOW to avoid writing through symlinks
             flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
             if hasattr(os, "O_NOFOLLOW"):
                 flags |= os.O_NOFOLLOW
             fd = os.open(resolved_path, flags, 0o644)
-            with os.fdopen(fd, "w", encoding="utf-8") as f:
-                f.write(content)
+            try:
+                _write_all(fd, data)
+            finally:
+                os.close(fd)
+            self._file_index.clear()
+            self._grep_cache.clear()
             
             return WriteResult(path=file_path, files_update=None)
         except (OSError, UnicodeEncodeError) as e:
             return WriteResult(error=f"Error writing file '{file_path}': {e}")
     
-    def edit(
+    def edit(  # noqa: PLR0911  # one early return per failure mode
         self, 
         file_path: str,
         old_string: str,
@@ -267,36 +603,50 @@ class FilesystemBackend:
         Returns EditResult. External storage sets files_update=None.
         """
         resolved_path = self._resolve_path(file_path)
-        
-        if not resolved_path.exists() or not resolved_path.is_file():
-            return EditResult(error=f"Error: File '{file_path}' not found")
-        
+        not_found = EditResult(error=f"Error: File '{file_path}' not found")
+
         try:
-            # Read securely
+            # Read securely. Existence and type come from the opened fd rather
+            # than separate exists()/is_file() stats on the path.
             try:
                 fd = os.open(resolved_path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
-                with os.fdopen(fd, "r", encoding="utf-8") as f:
-                    content = f.read()
             except OSError:
-                with open(resolved_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-            
-            result = perform_string_replacement(content, old_string, new_string, replace_all)
-            
-            if isinstance(result, str):
-                return EditResult(error=result)
-            
-            new_content, occurrences = result
-            
-            # Write securely
-            flags = os.O_WRONLY | os.O_TRUNC
-            if hasattr(os, "O_NOFOLLOW"):
-                flags |= os.O_NOFOLLOW
-            fd = os.open(resolved_path, flags)
-            with os.fdopen(fd, "w", encoding="utf-8") as f:
-                f.write(new_content)
-            
+                fd = os.open(resolved_path, os.O_RDONLY)
+            try:
+                mode = os.fstat(fd).st_mode
+                if not stat.S_ISREG(mode):
+                    return not_found
+                with os.fdopen(fd, "rb", closefd=False) as f:
+                    data = f.read()
+            finally:
+                os.close(fd)
+
+            if old_string and b"\r" not in data:
+                # UTF-8 is self-synchronizing, so on bytes without \r (which text
+                # mode would translate) matches and counts equal those on the
+                # decoded text; skip the decode/encode round-trip.
+                byte_result = perform_string_replacement(
+                    data, old_string.encode("utf-8"), new_string.encode("utf-8"), replace_all
+                )
+                if isinstance(byte_result, str):
+                    return EditResult(error=byte_result)
+                new_data, occurrences = byte_result
+            else:
+                content = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+                result = perform_string_replacement(content, old_string, new_string, replace_all)
+
+                if isinstance(result, str):
+                    return EditResult(error=result)
+
+                new_content, occurrences = result
+                new_data = new_content.encode("utf-8")
+
+            # Swap in the new content atomically; readers never see a partial file
+            _replace_file(resolved_path, new_data, mode)
+
             return EditResult(path=file_path, files_update=None, occurrences=int(occurrences))
+        except FileNotFoundError:
+            return not_found
         except (OSError, UnicodeDecodeError, UnicodeEncodeError) as e:
             return EditResult(error=f"Error editing file '{file_path}': {e}")
     
@@ -308,9 +658,9 @@ class FilesystemBackend:
         path: Optional[str] = None,
         glob: Optional[str] = None,
     ) -> list[GrepMatch] | str:
-        # Validate regex
+        # Validate regex; the compiled pattern is reused by the Python fallback
         try:
-            re.compile(pattern)
+            regex = compile_regex(pattern)
         except re.error as e:
             return f"Invalid regex pattern: {e}"
 
@@ -323,10 +673,14 @@ class FilesystemBackend:
         if not base_full.exists():
             return []
 
-        # Try ripgrep first
-        results = self._ripgrep_search(pattern, base_full, glob)
-        if results is None:
-            results = self._python_search(pattern, base_full, glob)
+        def search() -> dict[str, list[tuple[int, str]]]:
+            # Try ripgrep first
+            results = self._ripgrep_search(pattern, base_full, glob)
+            if results is None:
+                results = self._python_search(regex, base_full, glob)
+            return results
+
+        results = self._cached_grep(("content", pattern, glob), base_full, glob, search)
 
         matches: list[GrepMatch] = []
         for fpath, items in results.items():
@@ -334,29 +688,231 @@ class FilesystemBackend:
                 matches.append({"path": fpath, "line": int(line_num), "text": line_text})
         return matches
 
+    def grep_files(
+        self,
+        pattern: str,
+        path: Optional[str] = None,
+        glob: Optional[str] = None,
+    ) -> list[str] | str:
+        """Return the paths of files containing at least one match.
+
+        Takes the same arguments and returns the same errors as grep_raw, but
+        runs ripgrep in files-only mode, which stops reading each file at its
+        first match and emits no line data.
+        """
+        try:
+            regex = compile_regex(pattern)
+        except re.error as e:
+            return f"Invalid regex pattern: {e}"
+
+        try:
+            base_full = self._resolve_path(path or ".")
+        except ValueError:
+            return []
+
+        if not base_full.exists():
+            return []
+
+        def search() -> list[str]:
+            paths = self._run_ripgrep(
+                ["--files-with-matches", "--null"], pattern, base_full, glob, self._parse_ripgrep_paths
+            )
+            if paths is None:
+                paths = list(self._python_search(regex, base_full, glob, first_only=True))
+            return paths
+
+        return list(self._cached_grep(("files", pattern, glob), base_full, glob, search))
+
+    def grep_counts(
+        self,
+        pattern: str,
+        path: Optional[str] = None,
+        glob: Optional[str] = None,
+    ) -> dict[str, int] | str:
+        """Return the number of matching lines in each file with a match.
+
+        Takes the same arguments and returns the same errors as grep_raw, but
+        runs ripgrep in count mode, which emits one total per file instead of
+        every matching line.
+        """
+        try:
+            regex = compile_regex(pattern)
+        except re.error as e:
+            return f"Invalid regex pattern: {e}"
+
+        try:
+            base_full = self._resolve_path(path or ".")
+        except ValueError:
+            return {}
+
+        if not base_full.exists():
+            return {}
+
+        def search() -> dict[str, int]:
+            counts = self._run_ripgrep(
+                ["--count", "--with-filename", "--null"], pattern, base_full, glob, self._parse_ripgrep_counts
+            )
+            if counts is None:
+                counts = {fpath: len(items) for fpath, items in self._python_search(regex, base_full, glob).items()}
+            return counts
+
+        return dict(self._cached_grep(("count", pattern, glob), base_full, glob, search))
+
+    def _cached_grep(
+        self,
+        query: tuple[str, str, Optional[str]],
+        base_full: Path,
+        include_glob: Optional[str],
+        search: Callable[[], _T],
+    ) -> _T:
+        """Return search(), reusing the previous result for an identical query.
+
+        Only the Python fallback is cached. A cached result is reused while
+        the searched tree is unchanged: the same file list (see
+        _grep_candidates) with the same inode, size and mtime for every file.
+        That catches edits made outside this backend, e.g. by a shell tool,
+        at the cost of one stat per file instead of reading every file again.
+        With ripgrep available that walk would cost about as much as the
+        search itself, so every query runs fresh.
+        """
+        if self._rg_path is not None:
+            return search()
+
+        root = str(base_full if base_full.is_dir() else base_full.parent)
+        candidates = self._grep_candidates(root, include_glob)
+        fingerprint = _stat_fingerprint(fp for fp, _ in candidates)
+
+        key = (*query, str(base_full))
+        cached = self._grep_cache.pop(key, None)
+        if cached is not None and cached[0] is candidates and cached[1] == fingerprint:
+            # Re-insert to keep the most recently used entries last
+            self._grep_cache[key] = cached
+            return cached[2]
+
+        result = search()
+        if len(self._grep_cache) >= _GREP_CACHE_MAX_ENTRIES:
+            self._grep_cache.pop(next(iter(self._grep_cache)))
+        self._grep_cache[key] = (candidates, fingerprint, result)
+        return result
+
     def _ripgrep_search(
         self, pattern: str, base_full: Path, include_glob: Optional[str]
     ) -> Optional[dict[str, list[tuple[int, str]]]]:
-        cmd = ["rg", "--json"]
+        return self._run_ripgrep(["--json"], pattern, base_full, include_glob, self._parse_ripgrep_output)
+
+    def _run_ripgrep(
+        self,
+        mode_args: list[str],
+        pattern: str,
+        base_full: Path,
+        include_glob: Optional[str],
+        parse: Callable[[IO[bytes]], _T],
+    ) -> Optional[_T]:
+        """Run rg with mode_args and parse its stdout as it streams in.
+
+        Returns None if ripgrep is unavailable or times out.
+        """
+        if self._rg_path is None:
+            return None
+
+        cmd = [self._rg_path, *mode_args, "--no-messages"]
         if include_glob:
             cmd.extend(["--glob", include_glob])
         cmd.extend(["--", pattern, str(base_full)])
 
         try:
-            proc = subprocess.run(  # noqa: S603
+            proc = subprocess.Popen(  # noqa: S603
                 cmd,
-                capture_output=True,
-                text=True,
-                timeout=30,
-                check=False,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
             )
-        except (subprocess.TimeoutExpired, FileNotFoundError):
+        except OSError:
+            # rg was removed or is not executable; stop trying it
+            self._rg_path = None
+            return None
+
+        # Parse rg's output as it arrives instead of buffering all of stdout.
+        # A timer replaces subprocess.run's timeout.
+        timed_out = threading.Event()
+
+        def _kill() -> None:
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(_RIPGREP_TIMEOUT_SECONDS, _kill)
+        timer.start()
+        try:
+            results = parse(proc.stdout) if proc.stdout is not None else None
+        finally:
+            timer.cancel()
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+            if proc.stdout is not None:
+                proc.stdout.close()
+
+        if timed_out.is_set():
             return None
+        return results
+
+    def _parse_ripgrep_paths(self, stream: IO[bytes]) -> list[str]:
+        """Collect file paths from NUL-separated rg --files-with-matches output."""
+        paths: list[str] = []
+        for raw in stream.read(_RIPGREP_MAX_OUTPUT_BYTES).split(b"\0"):
+            if not raw:
+                continue
+            ftext = os.fsdecode(raw)
+            if self.virtual_mode:
+                virt = self._to_virtual_path(ftext)
+                if virt is None:
+                    continue
+                paths.append(virt)
+            else:
+                paths.append(ftext)
+        return paths
 
+    def _parse_ripgrep_counts(self, stream: IO[bytes]) -> dict[str, int]:
+        r"""Collect per-file totals from rg --count --null output.
+
+        Records are "path\0count\n"; splitting on NUL first keeps paths that
+        contain newlines intact.
+        """
+        counts: dict[str, int] = {}
+        chunks = stream.read(_RIPGREP_MAX_OUTPUT_BYTES).split(b"\0")
+        raw_path = chunks[0]
+        for chunk in chunks[1:]:
+            raw_count, _, next_path = chunk.partition(b"\n")
+            ftext = os.fsdecode(raw_path)
+            raw_path = next_path
+            try:
+                count = int(raw_count)
+            except ValueError:
+                continue
+            if self.virtual_mode:
+                virt = self._to_virtual_path(ftext)
+                if virt is None:
+                    continue
+                counts[virt] = count
+            else:
+                counts[ftext] = count
+        return counts
+
+    def _parse_ripgrep_output(self, lines: Iterable[bytes]) -> dict[str, list[tuple[int, str]]]:
+        """Collect match events from rg --json output lines.
+
+        Lines stay as raw bytes and go straight to the JSON decoder (orjson
+        when installed). Stops reading after _RIPGREP_MAX_OUTPUT_BYTES, far
+        beyond what a tool result can show, so huge result sets don't
+        exhaust memory.
+        """
         results: dict[str, list[tuple[int, str]]] = {}
-        for line in proc.stdout.splitlines():
+        consumed = 0
+        for line in lines:
+            consumed += len(line)
+            if consumed > _RIPGREP_MAX_OUTPUT_BYTES:
+                break
             try:
-                data = json.loads(line)
+                data = _json_loads(line)
             except json.JSONDecodeError:
                 continue
             if data.get("type") != "match":
@@ -365,14 +921,14 @@ class FilesystemBackend:
             ftext = pdata.get("path", {}).get("text")
             if not ftext:
                 continue
-            p = Path(ftext)
             if self.virtual_mode:
-                try:
-                    virt = "/" + str(p.resolve().relative_to(self.cwd))
-                except Exception:
+                # rg reports paths under the resolved search root and does not
+                # follow symlinks, so the root prefix can simply be stripped.
+                virt = self._to_virtual_path(ftext)
+                if virt is None:
                     continue
             else:
-                virt = str(p)
+                virt = ftext
             ln = pdata.get("line_number")
             lt = pdata.get("lines", {}).get("text", "").rstrip("\n")
             if ln is None:
@@ -382,96 +938,114 @@ class FilesystemBackend:
         return results
 
     def _python_search(
-        self, pattern: str, base_full: Path, include_glob: Optional[str]
+        self, regex: re.Pattern[str], base_full: Path, include_glob: Optional[str], *, first_only: bool = False
     ) -> dict[str, list[tuple[int, str]]]:
-        try:
-            regex = re.compile(pattern)
-        except re.error:
+        root = base_full if base_full.is_dir() else base_full.parent
+        candidates = self._grep_candidates(str(root), include_glob)
+
+        if not candidates:
             return {}
 
+        # Files lacking a literal every match needs are rejected from their raw
+        # bytes before anything is decoded; UTF-8 is self-synchronizing, so a
+        # byte-level hit exists exactly when the decoded text contains it.
+        literal = _required_literal(regex)
+        needle = literal.encode("utf-8") if literal is not None else None
+
+        # Files are independent, so scan them concurrently; map() keeps the
+        # walk order so results stay deterministic.
         results: dict[str, list[tuple[int, str]]] = {}
-        root = base_full if base_full.is_dir() else base_full.parent
+        with ThreadPoolExecutor(max_workers=min(len(candidates), _MAX_IO_WORKERS)) as pool:
+            scanned = pool.map(lambda c: _scan_file(regex, c[0], self.max_file_size_bytes, needle, first_only=first_only), candidates)
+            for (_, virt_path), file_matches in zip(candidates, scanned, strict=True):
+                if file_matches:
+                    results[virt_path] = file_matches
+
+        return results
+
+    def _grep_candidates(self, root: str, include_glob: Optional[str]) -> list[tuple[str, str]]:
+        """List (file, virtual path) pairs the Python grep fallback should scan.
 
-        for fp in root.rglob("*"):
-            if not fp.is_file():
+        The enumeration is cached per (root, include_glob) and reused as long
+        as no directory in the walk has a new mtime, which any file creation,
+        removal or rename inside it would cause.
+        """
+        key = (root, include_glob)
+        cached = self._file_index.get(key)
+        if cached is not None and _dirs_unchanged(cached[0]):
+            return cached[1]
+
+        include = compile_glob(include_glob) if include_glob else None
+        dir_mtimes: dict[str, int] = {}
+        candidates: list[tuple[str, str]] = []
+        for entry in _walk_entries(root, dir_mtimes):
+            if include is not None and not include.match(entry.name):
                 continue
-            if include_glob and not wcglob.globmatch(fp.name, include_glob, flags=wcglob.BRACE):
+            if os.path.splitext(entry.name)[1].lower() in _BINARY_EXTENSIONS:  # noqa: PTH122  # no Path per file
                 continue
             try:
-                if fp.stat().st_size > self.max_file_size_bytes:
+                if not entry.is_file():
                     continue
             except OSError:
                 continue
-            try:
-                content = fp.read_text()
-            except (UnicodeDecodeError, PermissionError, OSError):
-                continue
-            for line_num, line in enumerate(content.splitlines(), 1):
-                if regex.search(line):
-                    if self.virtual_mode:
-                        try:
-                            virt_path = "/" + str(fp.resolve().relative_to(self.cwd))
-                        except Exception:
-                            continue
-                    else:
-                        virt_path = str(fp)
-                    results.setdefault(virt_path, []).append((line_num, line))
+            if not self.virtual_mode:
+                virt_path: Optional[str] = entry.path
+            elif entry.is_symlink():
+                # Only symlinks need resolving; their target must stay under root
+                virt_path = self._to_virtual_path(os.path.realpath(entry.path))
+            else:
+                virt_path = self._to_virtual_path(entry.path)
+            if virt_path is not None:
+                candidates.append((entry.path, virt_path))
+
+        if len(self._file_index) >= _FILE_INDEX_MAX_ENTRIES:
+            self._file_index.pop(next(iter(self._file_index)))
+        self._file_index[key] = (dir_mtimes, candidates)
+        return candidates
 
-        return results
-    
     def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
         if pattern.startswith("/"):
             pattern = pattern.lstrip("/")
+        if not pattern:
+            return []
 
         search_path = self.cwd if path == "/" else self._resolve_path(path)
         if not search_path.exists() or not search_path.is_dir():
             return []
 
+        # Path.rglob(pattern) semantics: match at any depth, dotfiles included.
+        # The compiled matcher is cached, and the scandir walk only stats the
+        # entries whose relative path matches.
+        if not pattern.startswith("**"):
+            pattern = "**/" + pattern
+        matcher = compile_glob(pattern, wcglob.GLOBSTAR | wcglob.BRACE | wcglob.DOTMATCH)
+        root = str(search_path)
+        root_prefix = root.rstrip("/") + "/"
+
         results: list[FileInfo] = []
-        try:
-            # Use recursive globbing to match files in subdirectories as tests expect
-            for matched_path in search_path.rglob(pattern):
-                try:
-                    is_file = matched_path.is_file()
-                except OSError:
-                    continue
-                if not is_file:
+        for entry in _walk_entries(root):
+            abs_path = entry.path
+            if not matcher.match(abs_path[len(root_prefix):]):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            if self.virtual_mode:
+                virt_path = self._to_virtual_path(abs_path)
+                if virt_path is None:
                     continue
-                abs_path = str(matched_path)
-                if not self.virtual_mode:
-                    try:
-                        st = matched_path.stat()
-                        results.append({
-                            "path": abs_path,
-                            "is_dir": False,
-                            "size": int(st.st_size),
-                            "modified_at": datetime.fromtimestamp(st.st_mtime).isoformat(),
-                        })
-                    except OSError:
-                        results.append({"path": abs_path, "is_dir": False})
-                else:
-                    cwd_str = str(self.cwd)
-                    if not cwd_str.endswith("/"):
-                        cwd_str += "/"
-                    if abs_path.startswith(cwd_str):
-                        relative_path = abs_path[len(cwd_str):]
-                    elif abs_path.startswith(str(self.cwd)):
-                        relative_path = abs_path[len(str(self.cwd)):].lstrip("/")
-                    else:
-                        relative_path = abs_path
-                    virt = "/" + relative_path
-                    try:
-                        st = matched_path.stat()
-                        results.append({
-                            "path": virt,
-                            "is_dir": False,
-                            "size": int(st.st_size),
-                            "modified_at": datetime.fromtimestamp(st.st_mtime).isoformat(),
-                        })
-                    except OSError:
-                        results.append({"path": virt, "is_dir": False})
-        except (OSError, ValueError):
-            pass
+                entry_path = virt_path
+            else:
+                entry_path = abs_path
+            results.append({
+                "path": entry_path,
+                "is_dir": False,
+                "size": int(st.st_size),
+                "modified_at": _format_mtime(st.st_mtime),
+            })
 
         results.sort(key=lambda x: x.get("path", ""))
         return results
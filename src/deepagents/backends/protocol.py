@@ -12,7 +12,7 @@ from deepagents.backends.utils import FileInfo, GrepMatch
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class WriteResult:
     """Result from backend write operations.
     Attributes:
@@ -35,7 +35,7 @@ class WriteResult:
     files_update: dict[str, Any] | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class EditResult:
     """Result from backend edit operations.
     Attributes:
@@ -119,4 +119,45 @@ class BackendProtocol(Protocol):
         ...
 
 
+@runtime_checkable
+class LsPathsBackendProtocol(BackendProtocol, Protocol):
+    """Optional extension for backends that can list paths without stat data.
+
+    The ls tool checks for it with isinstance() and otherwise takes the
+    paths from ls_info.
+    """
+
+    def ls_paths(self, path: str) -> list[str]:
+        """Same paths as ls_info(path), with a trailing / on directories."""
+        ...
+
+
+@runtime_checkable
+class GrepSummaryBackendProtocol(BackendProtocol, Protocol):
+    """Optional extension for backends that can summarize grep results.
+
+    Backends implementing it report matching files or per-file totals
+    without returning every matching line. The grep tool checks for it with
+    isinstance() and otherwise derives both from grep_raw.
+    """
+
+    def grep_files(
+        self,
+        pattern: str,
+        path: Optional[str] = None,
+        glob: Optional[str] = None,
+    ) -> list[str] | str:
+        """Paths of files with at least one match, or error string for invalid input."""
+        ...
+
+    def grep_counts(
+        self,
+        pattern: str,
+        path: Optional[str] = None,
+        glob: Optional[str] = None,
+    ) -> dict[str, int] | str:
+        """Matching line count per file with a match, or error string for invalid input."""
+        ...
+
+
 BackendFactory: TypeAlias = Callable[[ToolRuntime], BackendProtocol]
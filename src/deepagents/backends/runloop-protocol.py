@@ -1,9 +1,16 @@
 """BackendProtocol implementation for Runloop.
 """
 
-import datetime
+import asyncio
+import base64
+import functools
+import json
 import os
+import posixpath
 import re
+import shlex
+import time
+import uuid
 from typing import Optional
 
 from runloop_api_client import Runloop
@@ -13,10 +20,139 @@ from deepagents.backends.utils import (
     FileInfo,
     GrepMatch,
     check_empty_content,
+    check_replacement_occurrences,
     format_content_with_line_numbers,
     perform_string_replacement,
 )
 
+_GLOB_CHARS = frozenset("*?[")
+
+# Upper bound on cached directory listings per backend
+_LS_CACHE_MAX_ENTRIES = 128
+
+# Arguments are base64-encoded, so beyond this size fall back to download/upload
+_MAX_REMOTE_EDIT_ARG_BYTES = 64 * 1024
+
+# Content is inlined base64-encoded into the write command up to this size;
+# larger files go through upload_file()
+_MAX_INLINE_WRITE_BYTES = 64 * 1024
+
+# Runs in the devbox: argv is base64(path), base64(old), base64(new), replace_all.
+# Prints the occurrence count (-1 if the file is missing) and only writes the
+# file back when the replacement is valid. Must not contain single quotes.
+_REMOTE_EDIT_SCRIPT = """import base64, sys
+path, old, new = (base64.b64decode(a).decode("utf-8") for a in sys.argv[1:4])
+try:
+    with open(path, encoding="utf-8", newline="") as f:
+        text = f.read()
+except FileNotFoundError:
+    print(-1)
+    sys.exit(0)
+count = text.count(old)
+if count == 1 or (count > 1 and sys.argv[4] == "1"):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(text.replace(old, new))
+print(count)
+"""
+
+# Runs in the devbox: argv is the search path and the glob pattern. Prints one
+# JSON object per matching regular file.
+_GLOB_SCRIPT = """import glob, json, os, sys
+os.chdir(sys.argv[1])
+for m in glob.glob(sys.argv[2], recursive=True):
+    if os.path.isfile(m):
+        s = os.stat(m)
+        print(json.dumps({"path": m, "size": s.st_size, "mtime": s.st_mtime}))
+"""
+
+
+def _inline_write_command(file_path: str, data: bytes) -> Optional[str]:
+    """Build a shell command that creates file_path with data in one exec.
+
+    The command does the existence check and the write together and prints
+    "exists" or "ok"; noclobber makes the redirect itself refuse to overwrite
+    a file created in between. It prints nothing when the devbox has no
+    base64 tool.
+
+    Returns:
+        The command, or None if data is too large to inline.
+    """
+    if len(data) > _MAX_INLINE_WRITE_BYTES // 4 * 3:
+        return None
+    encoded = base64.b64encode(data).decode("ascii")
+    quoted_path = shlex.quote(file_path)
+    parent = shlex.quote(posixpath.dirname(file_path) or ".")
+    return (
+        f"set -C; "
+        f"if [ -e {quoted_path} ]; then echo 'exists'; "
+        f"elif command -v base64 >/dev/null 2>&1; then "
+        f"mkdir -p {parent} && printf '%s' '{encoded}' | base64 -d > {quoted_path} && echo 'ok'; "
+        f"fi"
+    )
+
+
+def _write_exists_error(file_path: str) -> WriteResult:
+    """Return the error result for writing over an existing file."""
+    return WriteResult(
+        error=f"Cannot write to {file_path} because it already exists. Read and then make an edit, or write to a new path."
+    )
+
+
+def glob_to_find_expr(pattern: str) -> Optional[tuple[str, list[str]]]:
+    """Translate a glob pattern into a `find` start directory and arguments.
+
+    Only the shapes that map exactly onto `find` are translated: an optional
+    literal directory prefix, an optional `**` segment, and a final name
+    pattern (e.g. "*.py", "src/*.py", "**/*.ts", "src/**/test_*.py").
+
+    Args:
+        pattern: Glob pattern relative to the search path.
+
+    Returns:
+        Tuple of (start_dir, find_args) relative to the search path, or None
+        if the pattern needs the full Python glob semantics.
+    """
+    parts = [p for p in pattern.split("/") if p and p != "."]
+    if not parts:
+        return None
+
+    name = parts[-1]
+    dirs = parts[:-1]
+    recursive = bool(dirs) and dirs[-1] == "**"
+    if recursive:
+        dirs = dirs[:-1]
+
+    if name == "**" or any(seg == ".." or "\\" in seg or _GLOB_CHARS.intersection(seg) for seg in dirs):
+        return None
+
+    start_dir = "/".join([".", *dirs])
+    args = ["-mindepth", "1"]
+    if not recursive:
+        args += ["-maxdepth", "1"]
+    args += ["-type", "f", "-name", name]
+    # Python's glob skips hidden entries unless the pattern names them
+    # explicitly. Hidden directories spelled out in the pattern are part of
+    # start_dir, so only path parts below it are filtered.
+    if not name.startswith("."):
+        args += ["!", "-name", ".*"]
+    if recursive:
+        args += ["!", "-path", f"{start_dir}/.*/*", "!", "-path", f"{start_dir}/*/.*/*"]
+    return start_dir, args
+
+
+@functools.lru_cache(maxsize=256)
+def _quoted_find_expr(pattern: str) -> Optional[str]:
+    """Return the shell-quoted `find` start directory and arguments for pattern.
+
+    Memoizes glob_to_find_expr() together with the quoting, since agents tend
+    to glob the same few patterns over and over.
+    """
+    find_expr = glob_to_find_expr(pattern)
+    if find_expr is None:
+        return None
+    start_dir, find_args = find_expr
+    return " ".join(shlex.quote(arg) for arg in [start_dir, *find_args])
+
 
 class RunloopBackend:
     """Backend that operates on files in a Runloop devbox.
@@ -65,11 +201,74 @@ class RunloopBackend:
         # return stderr here instead / in addition to stdout.
         return (result.stdout or "", result.exit_status)
 
+    async def aexec(self, command: str) -> tuple[str, int]:
+        """Async variant of exec().
+
+        The blocking client call runs in a worker thread, so several commands
+        can be awaited concurrently with asyncio.gather() without blocking
+        the event loop.
+        """
+        return await asyncio.to_thread(self.exec, command)
+
+    def exec_many(self, commands: list[str]) -> list[tuple[str, int]]:
+        """Execute several commands in order with a single devbox round-trip.
+
+        Each command runs in its own subshell, so a failing or exiting command
+        does not stop the ones after it. Its exit status is printed after a
+        random marker line, which is how the combined stdout is split back
+        into one (stdout, exit_status) pair per command.
+
+        Args:
+            commands: Shell commands to run, in order.
+
+        Returns:
+            One (stdout, exit_status) tuple per command, in the same order.
+        """
+        if not commands:
+            return []
+        marker = f"__exec_many_{uuid.uuid4().hex}__"
+        script = "\n".join(
+            f"(\n{command}\n)\nprintf '\\n{marker}%d\\n' \"$?\"" for command in commands
+        )
+        stdout, exit_status = self.exec(script)
+
+        parts = re.split(f"\n{marker}(\\d+)\n", stdout)
+        results = [
+            (parts[i], int(parts[i + 1])) for i in range(0, len(parts) - 1, 2)
+        ]
+        # Commands whose marker never appeared (e.g. the devbox call failed
+        # part way) report the overall exit status and no output.
+        results.extend(("", exit_status or 1) for _ in range(len(commands) - len(results)))
+        return results
+
 
 class RunloopProtocol(BackendProtocol):
-    def __init__(self, backend):
+    def __init__(self, backend, max_glob_results: int = 100_000, ls_cache_ttl: float = 5.0):
         self._backend = backend
-        
+        self._max_glob_results = max_glob_results
+        # Listings are cached for ls_cache_ttl seconds (0 disables caching),
+        # keyed by the normalized directory path; writes and edits through
+        # this backend drop the affected entries.
+        self._ls_cache_ttl = ls_cache_ttl
+        self._ls_cache: dict[str, tuple[float, list[FileInfo]]] = {}
+
+    def invalidate_ls_cache(self) -> None:
+        """Drop all cached directory listings.
+
+        Call this after the devbox filesystem was changed by other means,
+        e.g. by running shell commands in it.
+        """
+        self._ls_cache.clear()
+
+    def _invalidate_ls_path(self, file_path: str) -> None:
+        """Drop cached listings of every directory containing file_path."""
+        parent = posixpath.normpath(file_path)
+        while True:
+            parent, child = posixpath.dirname(parent) or ".", parent
+            self._ls_cache.pop(parent, None)
+            if parent == child:
+                break
+
     def ls_info(self, path: str) -> list[FileInfo]:
         """List files and directories in the specified directory (non-recursive).
 
@@ -80,8 +279,53 @@ class RunloopProtocol(BackendProtocol):
             List of FileInfo dicts for files and directories directly in the directory.
             Directories have a trailing / in their path and is_dir=True.
         """
-        # Use find to list only direct children
-        cmd = f"find '{path}' -maxdepth 1 -mindepth 1 -printf '%p %s %T@ %y %Y\\n' 2>/dev/null"
+        path = posixpath.normpath(path)
+        cached = self._ls_cache.get(path)
+        if cached is not None:
+            if time.monotonic() - cached[0] < self._ls_cache_ttl:
+                # Copies, so callers can't change the cached entries
+                return [fi.copy() for fi in cached[1]]
+            del self._ls_cache[path]
+
+        results = self._list_dir(path)
+        if self._ls_cache_ttl > 0:
+            if len(self._ls_cache) >= _LS_CACHE_MAX_ENTRIES:
+                self._ls_cache.pop(next(iter(self._ls_cache)))
+            self._ls_cache[path] = (time.monotonic(), results)
+        return [fi.copy() for fi in results]
+
+    def ls_paths(self, path: str) -> list[str]:
+        """List the paths directly in a directory, without stat data.
+
+        Returns the same sorted paths as ls_info(), with a trailing / on
+        directories, but the remote `find` only reports the entry type, so
+        the devbox never stats the entries for sizes or modification times.
+        """
+        path = posixpath.normpath(path)
+        cached = self._ls_cache.get(path)
+        if cached is not None and time.monotonic() - cached[0] < self._ls_cache_ttl:
+            return [fi["path"] for fi in cached[1]]
+
+        cmd = f"find {shlex.quote(path)} -maxdepth 1 -mindepth 1 -printf '%y\\0%p\\0' 2>/dev/null"
+        stdout, exit_code = self._backend.exec(cmd)
+        if exit_code != 0:
+            return []
+
+        fields = iter(stdout.split("\0"))
+        paths = [entry + "/" if filetype == "d" else entry for filetype, entry in zip(fields, fields, strict=False)]
+        paths.sort()
+        return paths
+
+    def _list_dir(self, path: str) -> list[FileInfo]:
+        """Run the remote `find` listing behind ls_info()."""
+        # Use find to list only direct children, as NUL-terminated fields so
+        # that any file name parses. %T+ has find format the mtime in the
+        # devbox as YYYY-MM-DD+HH:MM:SS.nnnnnnnnnn, so no datetime is built
+        # per entry.
+        cmd = (
+            f"find {shlex.quote(path)} -maxdepth 1 -mindepth 1 "
+            f"-printf '%y\\0%Y\\0%s\\0%T+\\0%p\\0' 2>/dev/null"
+        )
         stdout, exit_code = self._backend.exec(cmd)
 
         if exit_code != 0 or not stdout.strip():
@@ -91,20 +335,19 @@ class RunloopProtocol(BackendProtocol):
             return []
 
         results: list[FileInfo] = []
-        for line in stdout.strip().split("\n"):
-            if not line:
-                continue
-
-            # Parse out the listing info.
-            (path, size, modified_secs, filetype, realtype) = line.split()
-            modtime = datetime.datetime.fromtimestamp(float(modified_secs)).isoformat()
+        # Five fields per entry; zip() over one iterator walks them in strides
+        # and drops the empty tail after the final NUL.
+        fields = iter(stdout.split("\0"))
+        for filetype, _realtype, size, modified, entry_path in zip(fields, fields, fields, fields, fields, strict=False):
+            # ISO 8601 with microseconds, as datetime.isoformat() would give
+            modtime = f"{modified[:10]}T{modified[11:26]}"
 
             file_info: FileInfo = {
-                "path": path + "/" if filetype == "d" else path,
+                "path": entry_path + "/" if filetype == "d" else entry_path,
                 "is_dir": filetype == "d",
                 "is_file": filetype == "f",
                 "is_link": filetype == "l",
-                "size": size if filetype == "f" else 0,
+                "size": int(size) if filetype == "f" else 0,
                 "modified_at": modtime,
             }
             results.append(file_info)
@@ -128,13 +371,17 @@ class RunloopProtocol(BackendProtocol):
         Returns:
             Formatted file content with line numbers, or error message.
         """
-        # Check if file exists and get content
+        # Check if file exists and get content. sed quits right after the
+        # last requested line instead of streaming the rest of the file.
         start_line = offset + 1
+        end_line = offset + limit
+        quoted_path = shlex.quote(file_path)
+        window = f"sed -n '{start_line},{end_line}p;{end_line}q' {quoted_path}" if limit > 0 else ":"
         cmd = (
-            f"if [ ! -f '{file_path}' ]; then "
+            f"if [ ! -f {quoted_path} ]; then "
             f"echo 'Error: File not found'; exit 1; "
             f"else "
-            f"tail -n +{start_line} '{file_path}' | head -n {limit}; "
+            f"{window}; "
             f"fi"
         )
         stdout, exit_code = self._backend.exec(cmd)
@@ -166,21 +413,78 @@ class RunloopProtocol(BackendProtocol):
         # * is the intent here to only support text formats, as with read() and edit()?
         # * for text, any assumptions/requirements about the character set?
         
+        # Cached listings of the parent directories go stale once the file exists
+        try:
+            # Encode once; the same bytes feed the inline command or the upload.
+            data = content.encode("utf-8")
+
+            # Small files are written with a single exec()
+            cmd = _inline_write_command(file_path, data)
+            if cmd is not None:
+                stdout, _ = self._backend.exec(cmd)
+                if "exists" in stdout:
+                    return _write_exists_error(file_path)
+                if "ok" in stdout:
+                    return WriteResult(path=file_path)
+
+            return self._upload_new_file(file_path, data)
+        finally:
+            self._invalidate_ls_path(file_path)
+
+    def write_many(self, files: dict[str, str]) -> list[WriteResult]:
+        """Create several new files, batching the small ones into one round-trip.
+
+        Each file gets the same checks and result as a write() call. Files
+        small enough to inline are written through exec_many(); larger ones
+        are uploaded one by one.
+
+        Args:
+            files: Mapping of file path to content.
+
+        Returns:
+            One WriteResult per file, in the order of files.
+        """
+        # Cached listings of the parent directories go stale once the files exist
+        try:
+            data_by_path: dict[str, bytes] = {}
+            inline_cmds: dict[str, str] = {}
+            for file_path, content in files.items():
+                data_by_path[file_path] = data = content.encode("utf-8")
+                cmd = _inline_write_command(file_path, data)
+                if cmd is not None:
+                    inline_cmds[file_path] = cmd
+
+            results: dict[str, WriteResult] = {}
+            outputs = self._backend.exec_many(list(inline_cmds.values()))
+            for file_path, (stdout, _) in zip(inline_cmds, outputs, strict=True):
+                if "exists" in stdout:
+                    results[file_path] = _write_exists_error(file_path)
+                elif "ok" in stdout:
+                    results[file_path] = WriteResult(path=file_path)
+
+            return [
+                results.get(file_path) or self._upload_new_file(file_path, data_by_path[file_path])
+                for file_path in files
+            ]
+        finally:
+            for file_path in files:
+                self._invalidate_ls_path(file_path)
+
+    def _upload_new_file(self, file_path: str, data: bytes) -> WriteResult:
+        """Check that file_path does not exist, then upload data to it."""
         # Check if file already exists
-        check_cmd = f"test -e '{file_path}' && echo 'exists' || echo 'ok'"
+        check_cmd = f"test -e {shlex.quote(file_path)} && echo 'exists' || echo 'ok'"
         stdout, _ = self._backend.exec(check_cmd)
 
         if "exists" in stdout:
-            return WriteResult(
-                error=f"Cannot write to {file_path} because it already exists. Read and then make an edit, or write to a new path."
-            )
+            return _write_exists_error(file_path)
 
         # Use the upload_file() method from the Runloop API client.
         try:
             self._backend._client.devboxes.upload_file(
                 id=self._backend._devbox_id,
                 path=file_path,
-                file=content.encode("utf-8"),  # NOTE: might want a different type?
+                file=data,  # NOTE: might want a different type?
             )
         except Exception as e:
             # TODO: catch specific exception
@@ -188,7 +492,7 @@ class RunloopProtocol(BackendProtocol):
 
         return WriteResult(path=file_path)
 
-    def edit(
+    def edit(  # noqa: PLR0911  # one early return per failure mode
         self,
         file_path: str,
         old_string: str,
@@ -206,33 +510,72 @@ class RunloopProtocol(BackendProtocol):
         Returns:
             EditResult with path and occurrences on success or error on failure.
         """
-        # QUESTIONS:
-        # * this downloads the whole file to replace things locally; are files guaranteed to be small?
-        # * what semantics do you want for non-existant / empty files?
-
+        # Cached listings of the parent directories go stale once the file changes
         try:
-            # fetch the file
-            response = self._backend._client.devboxes.download_file(
-                id=self._backend._devbox_id,
-                path=file_path
-            )
-            
-            # do the replacements
-            new_text, occurrences = perform_string_replacement(
-                response.text(), old_string, new_string, replace_all
-            )
+            # Replace inside the devbox so the file never crosses the network;
+            # only the occurrence count comes back.
+            encoded_args = [
+                base64.b64encode(arg.encode("utf-8")).decode("ascii")
+                for arg in (file_path, old_string, new_string)
+            ]
+            if sum(len(arg) for arg in encoded_args) <= _MAX_REMOTE_EDIT_ARG_BYTES:
+                quoted_args = " ".join(f"'{arg}'" for arg in encoded_args)
+                cmd = f"python3 -c '{_REMOTE_EDIT_SCRIPT}' {quoted_args} {int(replace_all)}"
+                stdout, exit_code = self._backend.exec(cmd)
+                try:
+                    occurrences = int(stdout.strip()) if exit_code == 0 else None
+                except ValueError:
+                    occurrences = None
+                if occurrences is not None:
+                    if occurrences < 0:
+                        return EditResult(error=f"Error: File '{file_path}' not found")
+                    error = check_replacement_occurrences(old_string, occurrences, replace_all=replace_all)
+                    if error:
+                        return EditResult(error=error)
+                    return EditResult(path=file_path, occurrences=occurrences)
+
+            # Fall back to a local replacement for oversized arguments or when
+            # python3 is unavailable in the devbox.
+            try:
+                # fetch the file
+                response = self._backend._client.devboxes.download_file(
+                    id=self._backend._devbox_id,
+                    path=file_path
+                )
 
-            # write back
-            self._backend._client.devboxes.upload_file(
-                id=self._backend._devbox_id,
-                path=file_path,
-                file=new_text.encode("utf-8"),  # NOTE: might want a different type?
-            )
-            return EditResult(path=file_path, occurrences=occurrences)
-        
-        except Exception as e:
-            # TODO: catch specific exception
-            return EditResult(error=f"Error writing file '{file_path}': {e}")
+                # do the replacements
+                if old_string:
+                    # UTF-8 is self-synchronizing, so matches and counts on the raw
+                    # bytes equal those on the decoded text; skip the
+                    # decode/encode round-trip.
+                    byte_result = perform_string_replacement(
+                        response.read(), old_string.encode("utf-8"), new_string.encode("utf-8"), replace_all
+                    )
+                    if isinstance(byte_result, str):
+                        return EditResult(error=byte_result)
+                    new_data, occurrences = byte_result
+                else:
+                    result = perform_string_replacement(
+                        response.text(), old_string, new_string, replace_all
+                    )
+                    if isinstance(result, str):
+                        return EditResult(error=result)
+                    new_text, occurrences = result
+                    new_data = new_text.encode("utf-8")
+
+                # write back
+                self._backend._client.devboxes.upload_file(
+                    id=self._backend._devbox_id,
+                    path=file_path,
+                    file=new_data,  # NOTE: might want a different type?
+                )
+                return EditResult(path=file_path, occurrences=occurrences)
+
+            except Exception as e:
+                # TODO: catch specific exception
+                return EditResult(error=f"Error writing file '{file_path}': {e}")
+        finally:
+            self._invalidate_ls_path(file_path)
 
     def grep_raw(
         self,
@@ -250,49 +593,72 @@ class RunloopProtocol(BackendProtocol):
         Returns:
             List of GrepMatch dicts on success, or error string on invalid input.
         """
-        # Use grep to search files.  NOTE: might need something
-        # differeent if you have other regex semantics.
-        search_path = path or "."
+        # recursive, with filename, with line number, NUL after the filename
+        stdout = self._run_grep("-rHnZ", pattern, path, glob)
+        if not stdout.strip():
+            return []
 
-        # Build grep command
-        grep_opts = "-rHn"  # recursive, with filename, with line number
+        # Parse grep output: path\0line_number:content. The NUL ends the path,
+        # so paths and content may both contain colons.
+        matches: list[GrepMatch] = []
+        for line in stdout.split("\n"):
+            file_path, sep, rest = line.partition("\0")
+            line_num, _, line_text = rest.partition(":")
+            if not sep or not line_num.isdigit():
+                continue
+            matches.append({"path": file_path, "line": int(line_num), "text": line_text})
 
-        # Add glob pattern if specified
-        if glob:
-            grep_opts += f" --include='{glob}'"
+        return matches
 
-        # Escape pattern for shell
-        pattern_escaped = pattern.replace("'", "\\'")
+    def grep_files(
+        self,
+        pattern: str,
+        path: Optional[str] = None,
+        glob: Optional[str] = None,
+    ) -> list[str] | str:
+        """Return the paths of files containing at least one match.
 
-        cmd = f"grep {grep_opts} -e '{pattern_escaped}' '{search_path}' 2>/dev/null || true"
-        stdout, _ = self._backend.exec(cmd)
+        Takes the same arguments as grep_raw, but the remote grep runs with
+        -l, so only file names cross the network instead of every matching
+        line.
+        """
+        stdout = self._run_grep("-rlZ", pattern, path, glob)
+        return [p for p in stdout.split("\0") if p]
 
-        if not stdout.strip():
-            return []
+    def grep_counts(
+        self,
+        pattern: str,
+        path: Optional[str] = None,
+        glob: Optional[str] = None,
+    ) -> dict[str, int] | str:
+        """Return the number of matching lines in each file with a match.
 
-        # Parse grep output: path:line_number:content
-        matches: list[GrepMatch] = []
-        for line in stdout.strip().split("\n"):
-            if not line:
-                continue
+        Takes the same arguments as grep_raw, but the remote grep runs with
+        -c, so only one total per file crosses the network.
+        """
+        # -H keeps the file name when path is a single file
+        stdout = self._run_grep("-rHcZ", pattern, path, glob)
+        counts: dict[str, int] = {}
+        for line in stdout.split("\n"):
+            file_path, sep, count = line.partition("\0")
+            # grep -c also reports files without matches as 0
+            if sep and count.isdigit() and count != "0":
+                counts[file_path] = int(count)
+        return counts
+
+    def _run_grep(self, grep_opts: str, pattern: str, path: Optional[str], glob: Optional[str]) -> str:
+        """Run grep in the devbox with the given mode options and return stdout."""
+        # Use grep to search files.  NOTE: might need something
+        # differeent if you have other regex semantics.
+        search_path = path or "."
 
-            # Split on first two colons to handle content with colons
-            parts = line.split(":", 2)
-            try:
-                file_path = parts[0]
-                line_num = int(parts[1])
-                line_text = parts[2]
-                matches.append(
-                    {
-                        "path": file_path,
-                        "line": line_num,
-                        "text": line_text,
-                    }
-                )
-            except ValueError:
-                continue
+        # Add glob pattern if specified
+        if glob:
+            grep_opts += f" --include={shlex.quote(glob)}"
 
-        return matches
+        cmd = f"grep {grep_opts} -e {shlex.quote(pattern)} {shlex.quote(search_path)} 2>/dev/null || true"
+        stdout, _ = self._backend.exec(cmd)
+        return stdout
 
     def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
         """Find files matching a glob pattern.
@@ -304,22 +670,15 @@ class RunloopProtocol(BackendProtocol):
         Returns:
             List of FileInfo dicts for matching files.
         """
-        # Use Python's glob module via remote execution
-        pattern_escaped = pattern.replace("'", "'\\''")
-        path_escaped = path.replace("'", "'\\''")
+        find_expr = _quoted_find_expr(pattern)
+        if find_expr is not None:
+            return self._find_glob_info(path, find_expr)
 
-        # Use a more complicated command, to grab stat output from the
-        # matching files.  Could be simplified if this isn't needed.
+        # Fall back to Python's glob module via remote execution. The script
+        # also grabs stat output from the matching files.
         python_cmd = (
-            f"python3 -c \""
-            f"import glob, os, json; "
-            f"os.chdir('{path_escaped}'); "
-            f"matches = glob.glob('{pattern_escaped}', recursive=True); "
-            f"for m in matches: "
-            f"  if os.path.isfile(m): "
-            f"    s = os.stat(m); "
-            f"    print(json.dumps({{'path': m, 'size': s.st_size, 'mtime': s.st_mtime}})); "
-            f"\" 2>/dev/null"
+            f"python3 -c {shlex.quote(_GLOB_SCRIPT)} "
+            f"{shlex.quote(path)} {shlex.quote(pattern)} 2>/dev/null"
         )
 
         stdout, exit_code = self._backend.exec(python_cmd)
@@ -333,8 +692,6 @@ class RunloopProtocol(BackendProtocol):
                 continue
 
             try:
-                import json
-
                 data = json.loads(line)
                 # Convert relative path to absolute based on search path
                 file_path = data["path"]
@@ -357,3 +714,45 @@ class RunloopProtocol(BackendProtocol):
 
         results.sort(key=lambda x: x.get("path", ""))
         return results
+
+    def _find_glob_info(self, path: str, find_expr: str) -> list[FileInfo]:
+        """Run a glob as a bounded `find` pipeline in the devbox.
+
+        Results are streamed through `head` so at most `max_glob_results`
+        entries ever leave the devbox, instead of materializing the whole
+        match list remotely. If more files match, the rest are dropped
+        silently; the kept entries are the first ones `find` emitted, in
+        directory order rather than sorted order.
+
+        Args:
+            path: Directory the glob is relative to.
+            find_expr: Quoted start directory and arguments from _quoted_find_expr().
+        """
+        cmd = (
+            f"cd {shlex.quote(path)} && "
+            f"find {find_expr} -printf '%p\\t%s\\t%T@\\n' 2>/dev/null "
+            f"| head -n {self._max_glob_results}"
+        )
+        stdout, exit_code = self._backend.exec(cmd)
+
+        if exit_code != 0 or not stdout.strip():
+            return []
+
+        base = "" if path == "/" else path.rstrip("/")
+        results: list[FileInfo] = []
+        for line in stdout.strip().split("\n"):
+            try:
+                rel_path, size, mtime = line.split("\t")
+                results.append(
+                    {
+                        "path": f"{base}/{rel_path.removeprefix('./')}",
+                        "is_dir": False,
+                        "size": int(size),
+                        "modified_at": str(float(mtime)),
+                    }
+                )
+            except ValueError:
+                continue
+
+        results.sort(key=lambda x: x.get("path", ""))
+        return results
@@ -12,6 +12,7 @@ from .utils import (
     create_file_data,
     update_file_data,
     file_data_to_string,
+    file_data_size,
     format_read_response,
     perform_string_replacement,
     _glob_search_files,
@@ -32,6 +33,8 @@ class StateBackend:
     (not direct mutation), operations return Command objects instead of None.
     This is indicated by the uses_state=True flag.
     """
+
+    __slots__ = ("runtime",)
     
     def __init__(self, runtime: "ToolRuntime"):
         """Initialize StateBackend with runtime.
@@ -72,7 +75,7 @@ class StateBackend:
                 continue
 
             # This is a file directly in the current directory
-            size = len("\n".join(fd.get("content", [])))
+            size = file_data_size(fd)
             infos.append({
                 "path": k,
                 "is_dir": False,
@@ -178,7 +181,7 @@ class StateBackend:
         infos: list[FileInfo] = []
         for p in paths:
             fd = files.get(p)
-            size = len("\n".join(fd.get("content", []))) if fd else 0
+            size = file_data_size(fd) if fd else 0
             infos.append({
                 "path": p,
                 "is_dir": False,
@@ -1,27 +1,60 @@
 """StoreBackend: Adapter for LangGraph's BaseStore (persistent, cross-thread)."""
 
 import re
+from collections.abc import Iterator
 from typing import Any, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from langchain.tools import ToolRuntime
 
 from langgraph.config import get_config
-from langgraph.store.base import BaseStore, Item
+from langgraph.store.base import BaseStore, Item, SearchItem
 from deepagents.backends.protocol import WriteResult, EditResult
 
 from deepagents.backends.utils import (
     create_file_data,
     update_file_data,
     file_data_to_string,
+    file_data_size,
     format_read_response,
     perform_string_replacement,
     _glob_search_files,
-    grep_matches_from_files,
+    _grep_matches,
+    compile_regex,
 )
 from deepagents.backends.utils import FileInfo, GrepMatch
 
 
+def _iter_store_pages(
+    store: BaseStore,
+    namespace: tuple[str, ...],
+    *,
+    query: str | None = None,
+    filter: dict[str, Any] | None = None,  # noqa: A002  # mirrors BaseStore.search
+    page_size: int = 100,
+) -> Iterator[list[SearchItem]]:
+    """Yield store search results page by page.
+
+    Takes the same arguments as StoreBackend._search_store_paginated, but lets
+    callers process and drop each page before the next one is fetched.
+    """
+    offset = 0
+    while True:
+        page_items = store.search(
+            namespace,
+            query=query,
+            filter=filter,
+            limit=page_size,
+            offset=offset,
+        )
+        if not page_items:
+            break
+        yield page_items
+        if len(page_items) < page_size:
+            break
+        offset += page_size
+
+
 class StoreBackend:
     """Backend that stores files in LangGraph's BaseStore (persistent).
     
@@ -30,6 +63,9 @@ class StoreBackend:
     
     The namespace can include an optional assistant_id for multi-agent isolation.
     """
+
+    __slots__ = ("runtime",)
+
     def __init__(self, runtime: "ToolRuntime"):
         """Initialize StoreBackend with runtime.
         
@@ -160,24 +196,12 @@ class StoreBackend:
             ```
         """
         all_items: list[Item] = []
-        offset = 0
-        while True:
-            page_items = store.search(
-                namespace,
-                query=query,
-                filter=filter,
-                limit=page_size,
-                offset=offset,
-            )
-            if not page_items:
-                break
+        for page_items in _iter_store_pages(
+            store, namespace, query=query, filter=filter, page_size=page_size
+        ):
             all_items.extend(page_items)
-            if len(page_items) < page_size:
-                break
-            offset += page_size
-
         return all_items
-    
+
     def ls_info(self, path: str) -> list[FileInfo]:
         """List files and directories in the specified directory (non-recursive).
 
@@ -220,7 +244,7 @@ class StoreBackend:
                 fd = self._convert_store_item_to_file_data(item)
             except ValueError:
                 continue
-            size = len("\n".join(fd.get("content", [])))
+            size = file_data_size(fd)
             infos.append({
                 "path": item.key,
                 "is_dir": False,
@@ -340,14 +364,25 @@ class StoreBackend:
     ) -> list[GrepMatch] | str:
         store = self._get_store()
         namespace = self._get_namespace()
-        items = self._search_store_paginated(store, namespace)
-        files: dict[str, Any] = {}
-        for item in items:
-            try:
-                files[item.key] = self._convert_store_item_to_file_data(item)
-            except ValueError:
-                continue
-        return grep_matches_from_files(files, pattern, path, glob)
+
+        # Validate once up front, so errors surface even for an empty store
+        try:
+            regex = compile_regex(pattern)
+        except re.error as e:
+            return f"Invalid regex pattern: {e}"
+
+        # Search one page at a time, so only a page of file contents is
+        # materialized at once
+        matches: list[GrepMatch] = []
+        for page_items in _iter_store_pages(store, namespace):
+            files: dict[str, Any] = {}
+            for item in page_items:
+                try:
+                    files[item.key] = self._convert_store_item_to_file_data(item)
+                except ValueError:
+                    continue
+            matches.extend(_grep_matches(files, regex, path, glob))
+        return matches
     
     def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
         store = self._get_store()
@@ -366,7 +401,7 @@ class StoreBackend:
         infos: list[FileInfo] = []
         for p in paths:
             fd = files.get(p)
-            size = len("\n".join(fd.get("content", []))) if fd else 0
+            size = file_data_size(fd) if fd else 0
             infos.append({
                 "path": p,
                 "is_dir": False,
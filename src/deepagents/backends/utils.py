@@ -5,10 +5,11 @@ helpers used by backends and the composite router. Structured helpers
 enable composition without fragile string parsing.
 """
 
+import functools
 import re
+from collections.abc import Iterable
 from datetime import UTC, datetime
-from pathlib import Path
-from typing import Any, Literal, TypedDict
+from typing import Any, AnyStr, Literal, TypedDict, overload
 
 import wcmatch.glob as wcglob
 
@@ -17,6 +18,17 @@ MAX_LINE_LENGTH = 10000
 LINE_NUMBER_WIDTH = 6
 TOOL_RESULT_TOKEN_LIMIT = 20000  # Same threshold as eviction
 TRUNCATION_GUIDANCE = "... [results truncated, try being more specific with your parameters]"
+_LINE_FORMAT = f"%{LINE_NUMBER_WIDTH}d\t%s"
+# Characters with meaning in wcmatch glob patterns (BRACE/GLOBSTAR flags)
+_GLOB_SPECIAL_CHARS = frozenset("*?[]{}!\\")
+# Characters that give a regex pattern meaning beyond its literal text
+_REGEX_METACHARS = frozenset(".^$*+?{}[]\\|()")
+# Shortest literal worth prefiltering files on when the pattern is a regex
+_MIN_REQUIRED_LITERAL = 3
+# A brace group the re module reads as a repeat count rather than literal text
+_REGEX_QUANTIFIER = re.compile(r"\{(?:\d+|\d*,\d*)\}")
+# Line boundaries str.splitlines() honors besides "\n"
+_EXTRA_LINE_BREAKS = "\r\v\f\x1c\x1d\x1e\x85\u2028\u2029"
 
 
 class FileInfo(TypedDict, total=False):
@@ -40,6 +52,39 @@ class GrepMatch(TypedDict):
     text: str
 
 
+@functools.lru_cache(maxsize=256)
+def compile_glob(pattern: str, flags: int = wcglob.BRACE) -> "wcglob.WcMatcher[str]":
+    """Compile a glob pattern into a reusable matcher.
+
+    wcmatch re-parses the pattern on every globmatch() call, so callers that
+    test many paths against the same pattern should match through this.
+
+    Args:
+        pattern: Glob pattern (e.g., "*.py", "**/*.{ts,tsx}")
+        flags: wcmatch glob flags
+
+    Returns:
+        Compiled matcher; use its match(path) method
+    """
+    return wcglob.compile(pattern, flags=flags)
+
+
+@functools.lru_cache(maxsize=128)
+def compile_regex(pattern: str) -> re.Pattern[str]:
+    """Compile a regex pattern, memoized across calls.
+
+    Agents tend to repeat the same grep pattern; this keeps compilation out of
+    the repeated calls. Invalid patterns raise re.error and are not cached.
+
+    Args:
+        pattern: Regex pattern
+
+    Returns:
+        Compiled pattern
+    """
+    return re.compile(pattern)
+
+
 def sanitize_tool_call_id(tool_call_id: str) -> str:
     r"""Sanitize tool_call_id to prevent path traversal and separator issues.
 
@@ -71,6 +116,14 @@ def format_content_with_line_numbers(
     else:
         lines = content
 
+    if not lines:
+        return ""
+
+    if max(map(len, lines)) <= MAX_LINE_LENGTH:
+        # Common case: no line needs chunking, so format every line with one
+        # pre-built format string and a single join.
+        return "\n".join(map(_LINE_FORMAT.__mod__, zip(range(start_line, start_line + len(lines)), lines, strict=True)))
+
     result_lines = []
     for i, line in enumerate(lines):
         line_num = i + start_line
@@ -121,6 +174,22 @@ def file_data_to_string(file_data: dict[str, Any]) -> str:
     return "\n".join(file_data["content"])
 
 
+def file_data_size(file_data: dict[str, Any]) -> int:
+    """Return the length of the content file_data_to_string() would build.
+
+    Sums the line lengths plus the joining newlines, without materializing
+    the joined string.
+
+    Args:
+        file_data: FileData dict with 'content' key
+
+    Returns:
+        Content length in characters
+    """
+    lines = file_data.get("content", [])
+    return max(sum(map(len, lines)) + len(lines) - 1, 0)
+
+
 def create_file_data(content: str, created_at: str | None = None) -> dict[str, Any]:
     """Create a FileData object with timestamps.
 
@@ -181,7 +250,13 @@ def format_read_response(
     if empty_msg:
         return empty_msg
 
-    lines = content.splitlines()
+    stored = file_data["content"]
+    if content.count("\n") == len(stored) - 1 and not any(sep in content for sep in _EXTRA_LINE_BREAKS):
+        # splitlines() would rebuild exactly the stored lines, minus a trailing
+        # empty one; window those instead of allocating every line again
+        lines = stored[:-1] if stored[-1] == "" else stored
+    else:
+        lines = content.splitlines()
     start_idx = offset
     end_idx = min(start_idx + limit, len(lines))
 
@@ -193,13 +268,16 @@ def format_read_response(
 
 
 def perform_string_replacement(
-    content: str,
-    old_string: str,
-    new_string: str,
+    content: AnyStr,
+    old_string: AnyStr,
+    new_string: AnyStr,
     replace_all: bool,
-) -> tuple[str, int] | str:
+) -> tuple[AnyStr, int] | str:
     """Perform string replacement with occurrence validation.
 
+    Works on str or on UTF-8 bytes; error messages always show old_string
+    as text.
+
     Args:
         content: Original content
         old_string: String to replace
@@ -209,16 +287,61 @@ def perform_string_replacement(
     Returns:
         Tuple of (new_content, occurrences) on success, or error message string
     """
+    old_text = old_string.decode("utf-8") if isinstance(old_string, bytes) else old_string
+    if not replace_all and old_string:
+        # Common case: a unique match. Stop looking after the second find
+        # instead of counting to the end, and splice the one occurrence out
+        # instead of scanning again with replace().
+        first = content.find(old_string)
+        if first != -1 and content.find(old_string, first + len(old_string)) == -1:
+            return content[:first] + new_string + content[first + len(old_string) :], 1
+
+    if replace_all and old_string and len(old_string) != len(new_string):
+        # Derive the count from the size change instead of a separate
+        # counting pass over the content
+        new_content = content.replace(old_string, new_string)
+        occurrences = (len(new_content) - len(content)) // (len(new_string) - len(old_string))
+        error = check_replacement_occurrences(old_text, occurrences, replace_all=replace_all)
+        if error:
+            return error
+        return new_content, occurrences
+
     occurrences = content.count(old_string)
 
+    error = check_replacement_occurrences(old_text, occurrences, replace_all=replace_all)
+    if error:
+        return error
+
+    new_content = content.replace(old_string, new_string)
+    return new_content, occurrences
+
+
+def check_replacement_occurrences(old_string: str, occurrences: int, *, replace_all: bool) -> str | None:
+    """Validate the number of occurrences found for a string replacement.
+
+    Args:
+        old_string: String being replaced
+        occurrences: Number of times old_string occurs in the content
+        replace_all: Whether all occurrences will be replaced
+
+    Returns:
+        Error message if the replacement should not proceed, None otherwise
+    """
     if occurrences == 0:
         return f"Error: String not found in file: '{old_string}'"
 
     if occurrences > 1 and not replace_all:
         return f"Error: String '{old_string}' appears {occurrences} times in file. Use replace_all=True to replace all instances, or provide a more specific string with surrounding context."
 
-    new_content = content.replace(old_string, new_string)
-    return new_content, occurrences
+    return None
+
+
+@overload
+def truncate_if_too_long(result: str) -> str: ...
+
+
+@overload
+def truncate_if_too_long(result: list[str]) -> list[str]: ...
 
 
 def truncate_if_too_long(result: list[str] | str) -> list[str] | str:
@@ -258,6 +381,16 @@ def _validate_path(path: str | None) -> str:
     return normalized
 
 
+def _glob_literal_dir(pattern: str) -> str:
+    """Return the leading directories of pattern that contain no glob syntax.
+
+    E.g. "src/pkg/**/*.py" -> "src/pkg/", "*.py" -> "". Every path the
+    pattern matches starts with this prefix.
+    """
+    end = next((i for i, c in enumerate(pattern) if c in _GLOB_SPECIAL_CHARS), len(pattern))
+    return pattern[: pattern.rfind("/", 0, end) + 1]
+
+
 def _glob_search_files(
     files: dict[str, Any],
     pattern: str,
@@ -294,13 +427,23 @@ def _glob_search_files(
     # - Use "**" explicitly for recursive matching.
     effective_pattern = pattern
 
+    matcher = compile_glob(effective_pattern, wcglob.BRACE | wcglob.GLOBSTAR)
+    # Cheap string checks that reject most paths before the matcher runs:
+    # the literal directories the pattern starts with, and, for patterns
+    # without any "/", that the match must be a direct child.
+    literal_dir = _glob_literal_dir(effective_pattern)
+    direct_only = "/" not in effective_pattern and "**" not in effective_pattern
     matches = []
     for file_path, file_data in filtered.items():
         relative = file_path[len(normalized_path) :].lstrip("/")
         if not relative:
             relative = file_path.split("/")[-1]
 
-        if wcglob.globmatch(relative, effective_pattern, flags=wcglob.BRACE | wcglob.GLOBSTAR):
+        if literal_dir and not relative.startswith(literal_dir):
+            continue
+        if direct_only and "/" in relative:
+            continue
+        if matcher.match(relative):
             matches.append((file_path, file_data["modified_at"]))
 
     matches.sort(key=lambda x: x[1], reverse=True)
@@ -325,13 +468,9 @@ def _format_grep_results(
         Formatted string output
     """
     if output_mode == "files_with_matches":
-        return "\n".join(sorted(results.keys()))
+        return _format_grep_paths(results)
     if output_mode == "count":
-        lines = []
-        for file_path in sorted(results.keys()):
-            count = len(results[file_path])
-            lines.append(f"{file_path}: {count}")
-        return "\n".join(lines)
+        return _format_grep_counts({file_path: len(matches) for file_path, matches in results.items()})
     lines = []
     for file_path in sorted(results.keys()):
         lines.append(f"{file_path}:")
@@ -340,6 +479,102 @@ def _format_grep_results(
     return "\n".join(lines)
 
 
+def _format_grep_paths(paths: Iterable[str]) -> str:
+    """Format matching file paths, one per line in sorted order."""
+    return "\n".join(sorted(paths))
+
+
+def _format_grep_counts(counts: dict[str, int]) -> str:
+    """Format per-file match counts as "path: count" lines in path order."""
+    return "\n".join(f"{file_path}: {counts[file_path]}" for file_path in sorted(counts))
+
+
+def _required_literal(regex: re.Pattern[str]) -> str | None:
+    """Return a substring that every match of regex must contain, or None.
+
+    A pattern without metacharacters is its own literal. Otherwise the longest
+    run of plain characters outside any group, alternation or quantifier is
+    used, if at least _MIN_REQUIRED_LITERAL characters long. Files lacking the
+    literal can be skipped without running the regex over their lines.
+    """
+    pattern = regex.pattern
+    if regex.flags & re.IGNORECASE or "\r" in pattern or "(?" in pattern:
+        return None
+    if not any(c in _REGEX_METACHARS for c in pattern):
+        return pattern
+
+    best = ""
+    run: list[str] = []
+    depth = 0
+    i = 0
+    size = len(pattern)
+    while i < size:
+        c = pattern[i]
+        if c == "\\":
+            # Escapes may be classes (\w) or assertions (\b); just end the run
+            i += 2
+        elif c == "[":
+            # Skip the whole character class, including a leading ] or ^]
+            i += 1
+            if i < size and pattern[i] == "^":
+                i += 1
+            if i < size and pattern[i] == "]":
+                i += 1
+            while i < size and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            i += 1
+        elif c == "|":
+            if depth == 0:
+                # Top-level alternation: no single literal is required
+                return None
+            i += 1
+        else:
+            if c == "(":
+                depth += 1
+            elif c == ")":
+                depth -= 1
+            elif c in "?*{":
+                if c == "{":
+                    # Skip the repeat count so its digits aren't read as text.
+                    # A literal brace could hide a top-level | from the scan
+                    quantifier = _REGEX_QUANTIFIER.match(pattern, i)
+                    if quantifier is None:
+                        return None
+                    i = quantifier.end() - 1
+                # The preceding character is optional (or its count unknown)
+                if run:
+                    run.pop()
+            elif depth == 0 and c not in _REGEX_METACHARS:
+                run.append(c)
+                i += 1
+                continue
+            i += 1
+        if len(run) > len(best):
+            best = "".join(run)
+        run = []
+    if len(run) > len(best):
+        best = "".join(run)
+    if len(best) < _MIN_REQUIRED_LITERAL:
+        return None
+    return best
+
+
+def _matching_lines(lines: list[str], regex: re.Pattern[str], literal: str | None) -> list[tuple[int, str]]:
+    """Return (line_number, line) for every line of a file that regex matches.
+
+    literal is the pattern's _required_literal(), computed once per search.
+    """
+    pattern = regex.pattern
+    if literal == pattern:
+        # Literal pattern: a substring test is cheaper than the regex engine
+        return [(line_num, line) for line_num, line in enumerate(lines, 1) if pattern in line]
+    if literal is not None and literal not in "\n".join(lines):
+        # One C-level scan of the whole file rules out every line at once
+        return []
+    search = regex.search
+    return [(line_num, line) for line_num, line in enumerate(lines, 1) if search(line)]
+
+
 def _grep_search_files(
     files: dict[str, Any],
     pattern: str,
@@ -367,7 +602,7 @@ def _grep_search_files(
         ```
     """
     try:
-        regex = re.compile(pattern)
+        regex = compile_regex(pattern)
     except re.error as e:
         return f"Invalid regex pattern: {e}"
 
@@ -379,15 +614,15 @@ def _grep_search_files(
     filtered = {fp: fd for fp, fd in files.items() if fp.startswith(normalized_path)}
 
     if glob:
-        filtered = {fp: fd for fp, fd in filtered.items() if wcglob.globmatch(Path(fp).name, glob, flags=wcglob.BRACE)}
+        include = compile_glob(glob)
+        filtered = {fp: fd for fp, fd in filtered.items() if include.match(fp.rpartition("/")[2])}
 
+    literal = _required_literal(regex)
     results: dict[str, list[tuple[int, str]]] = {}
     for file_path, file_data in filtered.items():
-        for line_num, line in enumerate(file_data["content"], 1):
-            if regex.search(line):
-                if file_path not in results:
-                    results[file_path] = []
-                results[file_path].append((line_num, line))
+        hits = _matching_lines(file_data["content"], regex, literal)
+        if hits:
+            results[file_path] = hits
 
     if not results:
         return "No matches found"
@@ -410,10 +645,20 @@ def grep_matches_from_files(
     non-throwing in tool contexts and preserve user-facing error messages.
     """
     try:
-        regex = re.compile(pattern)
+        regex = compile_regex(pattern)
     except re.error as e:
         return f"Invalid regex pattern: {e}"
 
+    return _grep_matches(files, regex, path, glob)
+
+
+def _grep_matches(
+    files: dict[str, Any],
+    regex: re.Pattern[str],
+    path: str | None = None,
+    glob: str | None = None,
+) -> list[GrepMatch]:
+    """Return structured grep matches for an already compiled pattern."""
     try:
         normalized_path = _validate_path(path)
     except ValueError:
@@ -422,13 +667,14 @@ def grep_matches_from_files(
     filtered = {fp: fd for fp, fd in files.items() if fp.startswith(normalized_path)}
 
     if glob:
-        filtered = {fp: fd for fp, fd in filtered.items() if wcglob.globmatch(Path(fp).name, glob, flags=wcglob.BRACE)}
+        include = compile_glob(glob)
+        filtered = {fp: fd for fp, fd in filtered.items() if include.match(fp.rpartition("/")[2])}
 
+    literal = _required_literal(regex)
     matches: list[GrepMatch] = []
     for file_path, file_data in filtered.items():
-        for line_num, line in enumerate(file_data["content"], 1):
-            if regex.search(line):
-                matches.append({"path": file_path, "line": int(line_num), "text": line})
+        for line_num, line in _matching_lines(file_data["content"], regex, literal):
+            matches.append({"path": file_path, "line": line_num, "text": line})
     return matches
 
 
@@ -448,3 +694,17 @@ def format_grep_matches(
     if not matches:
         return "No matches found"
     return _format_grep_results(build_grep_results_dict(matches), output_mode)
+
+
+def format_grep_files(paths: list[str]) -> str:
+    """Format the paths returned by a backend's grep_files like files_with_matches output."""
+    if not paths:
+        return "No matches found"
+    return _format_grep_paths(paths)
+
+
+def format_grep_counts(counts: dict[str, int]) -> str:
+    """Format the totals returned by a backend's grep_counts like count output."""
+    if not counts:
+        return "No matches found"
+    return _format_grep_counts(counts)
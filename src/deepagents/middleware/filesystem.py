@@ -21,11 +21,13 @@ from langchain_core.tools import BaseTool, tool
 from langgraph.types import Command
 from typing_extensions import TypedDict
 
-from deepagents.backends.protocol import BackendProtocol, BackendFactory, WriteResult, EditResult
+from deepagents.backends.protocol import BackendProtocol, BackendFactory, GrepSummaryBackendProtocol, LsPathsBackendProtocol, WriteResult, EditResult
 from deepagents.backends import StateBackend
 from deepagents.backends.utils import (
     update_file_data,
     format_content_with_line_numbers,
+    format_grep_counts,
+    format_grep_files,
     format_grep_matches,
     truncate_if_too_long,
     sanitize_tool_call_id,
@@ -264,6 +266,9 @@ def _ls_tool_generator(
     def ls(runtime: ToolRuntime[None, FilesystemState], path: str) -> list[str]:
         resolved_backend = _get_backend(backend, runtime)
         validated_path = _validate_path(path)
+        # Backends that can list bare paths skip gathering per-entry stat data
+        if isinstance(resolved_backend, LsPathsBackendProtocol):
+            return resolved_backend.ls_paths(validated_path)
         infos = resolved_backend.ls_info(validated_path)
         return [fi.get("path", "") for fi in infos]
 
@@ -433,11 +438,24 @@ def _grep_tool_generator(
         output_mode: Literal["files_with_matches", "content", "count"] = "files_with_matches",
     ) -> str:
         resolved_backend = _get_backend(backend, runtime)
+        # Backends that can list matching files or per-file totals directly
+        # skip collecting every matching line
+        if isinstance(resolved_backend, GrepSummaryBackendProtocol):
+            if output_mode == "files_with_matches":
+                paths = resolved_backend.grep_files(pattern, path=path, glob=glob)
+                if isinstance(paths, str):
+                    return paths
+                return truncate_if_too_long(format_grep_files(paths))
+            if output_mode == "count":
+                counts = resolved_backend.grep_counts(pattern, path=path, glob=glob)
+                if isinstance(counts, str):
+                    return counts
+                return truncate_if_too_long(format_grep_counts(counts))
         raw = resolved_backend.grep_raw(pattern, path=path, glob=glob)
         if isinstance(raw, str):
             return raw
         formatted = format_grep_matches(raw, output_mode)
-        return truncate_if_too_long(formatted)  # type: ignore[arg-type]
+        return truncate_if_too_long(formatted)
 
     return grep
 
@@ -77,6 +77,8 @@ def test_filesystem_backend_virtual_mode(tmp_path: Path):
     # glob_info
     g = be.glob_info("**/*.md", path="/")
     assert any(i["path"] == "/dir/b.md" for i in g)
+    # A bare globstar lists every file
+    assert sorted(i["path"] for i in be.glob_info("**", path="/")) == ["/a.txt", "/dir/b.md", "/new.txt"]
 
     # invalid regex returns error string
     err = be.grep_raw("[", path="/")
@@ -221,3 +223,277 @@ def test_filesystem_backend_intercept_large_tool_result(tmp_path: Path):
     saved_file = root / "large_tool_results" / "test_fs_123"
     assert saved_file.exists()
     assert saved_file.read_text() == large_content
+
+
+def test_filesystem_backend_read_many_preserves_order(tmp_path: Path):
+    root = tmp_path
+    for i in range(5):
+        write_file(root / f"f{i}.txt", f"file {i}")
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True)
+
+    paths = ["/f3.txt", "/missing.txt", "/f0.txt", "/f4.txt"]
+    results = be.read_many(paths)
+    assert len(results) == len(paths)
+    assert "file 3" in results[0]
+    assert "not found" in results[1]
+    assert "file 0" in results[2]
+    assert "file 4" in results[3]
+    assert be.read_many([]) == []
+
+
+def test_filesystem_backend_read_many_large_files_past_index_capacity(tmp_path: Path):
+    root = tmp_path
+    paths = []
+    for i in range(12):
+        write_file(root / f"big{i}.log", "".join(f"file {i} line {n:06d}\n" for n in range(60_000)))
+        paths.append(f"/big{i}.log")
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True)
+
+    # More large files than the line index holds, indexed from many threads
+    results = be.read_many(paths * 2, offset=59_999, limit=1)
+    expected = [f" 60000\tfile {i} line 059999" for i in range(12)] * 2
+    assert results == expected
+
+
+def test_filesystem_backend_grep_line_numbers(tmp_path: Path):
+    root = tmp_path
+    write_file(root / "a.txt", "alpha\nbeta\n\ngamma beta\nbeta")
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True)
+
+    matches = be.grep_raw("beta", path="/")
+    assert [(m["line"], m["text"]) for m in matches] == [(2, "beta"), (4, "gamma beta"), (5, "beta")]
+
+    anchored = be.grep_raw("^beta$", path="/")
+    assert [m["line"] for m in anchored] == [2, 5]
+
+    # Patterns never match across line boundaries
+    assert be.grep_raw("alpha\\sbeta", path="/") == []
+
+    # Lookarounds at a line edge see only the line itself
+    assert [m["line"] for m in be.grep_raw(r"alpha(?!\s)", path="/")] == [1]
+    assert [m["line"] for m in be.grep_raw(r"(?<!\s)beta", path="/")] == [2, 5]
+
+    # Other line breaks split lines the same way str.splitlines() does
+    write_file(root / "b.txt", "one\ftwo\n")
+    assert [(m["line"], m["text"]) for m in be.grep_raw("^two", path="/b.txt")] == [(2, "two")]
+
+
+def test_filesystem_backend_grep_virtual_mode_skips_symlink_escape(tmp_path: Path):
+    root = tmp_path / "root"
+    outside = tmp_path / "outside.txt"
+    write_file(root / "inside.txt", "needle")
+    write_file(outside, "needle")
+    os.symlink(outside, root / "link.txt")
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True)
+
+    matches = be.grep_raw("needle", path="/")
+    assert [m["path"] for m in matches] == ["/inside.txt"]
+
+
+def test_filesystem_backend_edit_unicode_and_crlf(tmp_path: Path):
+    root = tmp_path
+    uni = root / "uni.txt"
+    crlf = root / "crlf.txt"
+    uni.write_bytes("héllo wörld\nhéllo\n".encode())
+    crlf.write_bytes(b"one\r\ntwo\r\n")
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True)
+
+    res = be.edit("/uni.txt", "héllo", "hi", replace_all=False)
+    assert res.error is not None and "appears 2 times" in res.error
+    res = be.edit("/uni.txt", "héllo", "hï", replace_all=True)
+    assert res.error is None and res.occurrences == 2
+    assert uni.read_text(encoding="utf-8") == "hï wörld\nhï\n"
+
+    res = be.edit("/crlf.txt", "one\ntwo", "three")
+    assert res.error is None and res.occurrences == 1
+
+
+def test_filesystem_backend_grep_sees_new_files_between_calls(tmp_path: Path):
+    root = tmp_path
+    write_file(root / "src" / "a.py", "token = 1")
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True)
+    assert [m["path"] for m in be.grep_raw("token", path="/")] == ["/src/a.py"]
+
+    # Created behind the backend's back, e.g. by a shell command
+    write_file(root / "src" / "b.py", "token = 2")
+    paths = sorted(m["path"] for m in be.grep_raw("token", path="/"))
+    assert paths == ["/src/a.py", "/src/b.py"]
+
+
+def test_filesystem_backend_grep_skips_binary_files(tmp_path: Path):
+    root = tmp_path
+    write_file(root / "text.txt", "needle")
+    (root / "blob.bin").write_bytes(b"needle\x00\x01\x02")
+    (root / "image.png").write_bytes(b"needle")
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True)
+
+    assert [m["path"] for m in be.grep_raw("needle", path="/")] == ["/text.txt"]
+
+
+def test_filesystem_backend_edit_replaces_atomically(tmp_path: Path):
+    root = tmp_path
+    f = root / "script.sh"
+    write_file(f, "echo a\necho a\n")
+    f.chmod(0o755)
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True)
+
+    res = be.edit("/script.sh", "a", "bee", replace_all=True)
+    assert res.error is None and res.occurrences == 2
+    assert f.read_text() == "echo bee\necho bee\n"
+    assert f.stat().st_mode & 0o777 == 0o755
+    # The temp file used for the swap is gone
+    assert [p.name for p in root.iterdir()] == ["script.sh"]
+
+    res = be.edit("/script.sh", "zzz", "y", replace_all=True)
+    assert res.error is not None and "not found" in res.error
+    # Errors from the bytes fast path quote old_string as text
+    res = be.edit("/script.sh", "echo", "x")
+    assert res.error is not None and "String 'echo' appears 2 times" in res.error
+
+
+def test_filesystem_backend_edit_keeps_links(tmp_path: Path):
+    root = tmp_path
+    target = root / "target.txt"
+    write_file(target, "hello")
+    link = root / "link.txt"
+    link.symlink_to(target)
+    twin = root / "twin.txt"
+    os.link(target, twin)
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=False)
+
+    # Edits are not written through symlinks, and the link stays a link
+    res = be.edit(str(link), "hello", "bye")
+    assert res.error is not None
+    assert link.is_symlink() and target.read_text() == "hello"
+
+    # Hard-linked files are rewritten in place, so every name sees the edit
+    res = be.edit(str(twin), "hello", "bye")
+    assert res.error is None
+    assert target.read_text() == twin.read_text() == "bye"
+    assert target.stat().st_ino == twin.stat().st_ino
+
+
+def test_filesystem_backend_grep_files(tmp_path: Path):
+    root = tmp_path
+    write_file(root / "a.py", "needle\nneedle")
+    write_file(root / "sub" / "b.txt", "needle")
+    write_file(root / "c.py", "hay")
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True)
+
+    assert sorted(be.grep_files("needle", path="/")) == ["/a.py", "/sub/b.txt"]
+    assert be.grep_files("needle", path="/", glob="*.py") == ["/a.py"]
+    assert be.grep_files("absent", path="/") == []
+    assert isinstance(be.grep_files("[", path="/"), str)
+
+
+def test_filesystem_backend_grep_cache_sees_external_edits(tmp_path: Path):
+    root = tmp_path
+    f = root / "a.txt"
+    write_file(f, "old needle")
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True)
+    assert [m["text"] for m in be.grep_raw("needle", path="/")] == ["old needle"]
+    assert be.grep_raw("needle", path="/") == be.grep_raw("needle", path="/")
+
+    # Rewritten in place behind the backend's back
+    f.write_text("new needle\nneedle")
+    assert [m["text"] for m in be.grep_raw("needle", path="/")] == ["new needle", "needle"]
+    assert be.grep_files("old", path="/") == []
+
+
+def test_filesystem_backend_grep_with_ripgrep_skips_python_walk(tmp_path: Path, monkeypatch):
+    write_file(tmp_path / "a.txt", "needle")
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    be._rg_path = "rg"
+
+    def fail_walk(self, root, include_glob):
+        raise AssertionError("ripgrep searches must not walk the tree in Python")
+
+    monkeypatch.setattr(FilesystemBackend, "_grep_candidates", fail_walk)
+    monkeypatch.setattr(FilesystemBackend, "_run_ripgrep", lambda self, mode_args, pattern, base_full, glob, parse: ["/a.txt"])
+    assert be.grep_files("needle", path="/") == ["/a.txt"]
+    assert be.grep_files("needle", path="/") == ["/a.txt"]
+
+
+def test_filesystem_backend_grep_counts(tmp_path: Path):
+    root = tmp_path
+    write_file(root / "a.py", "needle needle\nhay\nneedle")
+    write_file(root / "b.txt", "needle")
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True)
+
+    # Counts matching lines, not individual matches
+    assert be.grep_counts("needle", path="/") == {"/a.py": 2, "/b.txt": 1}
+    assert be.grep_counts("needle", path="/", glob="*.py") == {"/a.py": 2}
+    assert be.grep_counts("absent", path="/") == {}
+    assert isinstance(be.grep_counts("[", path="/"), str)
+
+
+def test_filesystem_backend_grep_regex_with_literal_prefilter(tmp_path: Path):
+    root = tmp_path
+    write_file(root / "a.py", "def test_one():\n    pass\ndef helper():")
+    write_file(root / "b.py", "def other():\n    pass")
+    write_file(root / "c.py", "aaaa")
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True)
+
+    matches = be.grep_raw(r"def test_\w+\(", path="/")
+    assert [(m["path"], m["line"]) for m in matches] == [("/a.py", 1)]
+    # Repeat counts are not mistaken for required text
+    assert [m["path"] for m in be.grep_raw("a{4}", path="/")] == ["/c.py"]
+    # A literal brace must not hide the alternation after it
+    write_file(root / "d.py", "zzz}")
+    assert [m["path"] for m in be.grep_raw("longprefix{|zzz}", path="/")] == ["/d.py"]
+
+
+def test_filesystem_backend_read_zero_limit(tmp_path: Path):
+    root = tmp_path
+    write_file(root / "small.txt", "a\nb\nc")
+    write_file(root / "big.txt", "".join(f"line {i:07d}\n" for i in range(100_000)))
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True)
+
+    for name, offset in [("/small.txt", 0), ("/small.txt", 2), ("/big.txt", 50_000)]:
+        assert be.read(name, offset=offset, limit=0) == ""
+        assert be.read(name, offset=offset, limit=-1) == ""
+    assert be.read("/small.txt", offset=3, limit=0).startswith("Error: Line offset 3 exceeds file length")
+
+
+def test_filesystem_backend_read_large_crlf_file_at_offset(tmp_path: Path):
+    root = tmp_path
+    f = root / "big.txt"
+    f.write_bytes("".join(f"line {i:07d}\r\n" for i in range(200_000)).encode())
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True)
+
+    # Not indexable because of \r, so the first read streams from the start
+    for _ in range(2):
+        out = be.read("/big.txt", offset=150_000, limit=2)
+        assert out.splitlines() == ["150001\tline 0150000", "150002\tline 0150001"]
+
+
+def test_filesystem_backend_read_large_file_windows(tmp_path: Path):
+    root = tmp_path
+    f = root / "big.log"
+    write_file(f, "".join(f"line {i:07d}\n" for i in range(100_000)))
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True)
+
+    out = be.read("/big.log", offset=99_998, limit=5)
+    assert out.splitlines() == [" 99999\tline 0099998", "100000\tline 0099999"]
+    assert "exceeds file length (100000 lines)" in be.read("/big.log", offset=100_000)
+
+    # Windows reflect edits made after the first read
+    res = be.edit("/big.log", "line 0050000", "edited")
+    assert res.error is None
+    assert be.read("/big.log", offset=50_000, limit=1).endswith("\tedited")
@@ -0,0 +1,289 @@
+import asyncio
+import importlib.util
+import subprocess
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from deepagents.backends import LsPathsBackendProtocol
+
+pytest.importorskip("runloop_api_client")
+
+_MODULE_PATH = Path(__file__).parents[2] / "src" / "deepagents" / "backends" / "runloop-protocol.py"
+_spec = importlib.util.spec_from_file_location("deepagents_runloop_protocol", _MODULE_PATH)
+runloop_protocol = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(runloop_protocol)
+
+
+class FakeDevboxes:
+    """Stands in for client.devboxes, running commands in a local bash."""
+
+    def __init__(self):
+        self.commands = []
+
+    def execute_and_await_completion(self, id, command):
+        self.commands.append(command)
+        proc = subprocess.run(["bash", "-c", command], capture_output=True, text=True, check=False)
+        return SimpleNamespace(stdout=proc.stdout, exit_status=proc.returncode)
+
+    def upload_file(self, id, path, file):
+        Path(path).write_bytes(file)
+
+
+def make_backend():
+    return runloop_protocol.RunloopBackend("dbx_test", client=SimpleNamespace(devboxes=FakeDevboxes()))
+
+
+def test_exec_many_splits_output_per_command(monkeypatch):
+    fixed = uuid.UUID(int=0)
+    monkeypatch.setattr(runloop_protocol.uuid, "uuid4", lambda: fixed)
+    marker = f"__exec_many_{fixed.hex}__"
+    backend = make_backend()
+
+    results = backend.exec_many(
+        [
+            "printf 'no newline'",
+            "echo line; exit 3",
+            f"printf 'inline {marker}7 text\\n{marker}x\\n'",
+            "printf ''",
+        ]
+    )
+
+    assert results == [
+        ("no newline", 0),
+        ("line\n", 3),
+        (f"inline {marker}7 text\n{marker}x\n", 0),
+        ("", 0),
+    ]
+    # One devbox round-trip for the whole batch
+    assert len(backend._client.devboxes.commands) == 1
+    assert backend.exec_many([]) == []
+
+
+def test_exec_many_reports_commands_after_an_aborted_script():
+    backend = make_backend()
+    # The script itself exits, so later commands never print their marker
+    results = backend.exec_many(["echo first", "kill -9 $$", "echo never"])
+    assert results[0] == ("first\n", 0)
+    assert results[1][1] != 0 and results[2] == ("", results[1][1])
+
+
+def test_aexec_runs_commands_concurrently():
+    backend = make_backend()
+
+    async def run():
+        return await asyncio.gather(backend.aexec("echo a"), backend.aexec("echo b; exit 2"))
+
+    assert asyncio.run(run()) == [("a\n", 0), ("b\n", 2)]
+
+
+def test_glob_to_find_expr_direct_and_recursive():
+    assert runloop_protocol.glob_to_find_expr("*.py") == (
+        ".",
+        ["-mindepth", "1", "-maxdepth", "1", "-type", "f", "-name", "*.py", "!", "-name", ".*"],
+    )
+    assert runloop_protocol.glob_to_find_expr("src/**/*.py") == (
+        "./src",
+        [
+            "-mindepth",
+            "1",
+            "-type",
+            "f",
+            "-name",
+            "*.py",
+            "!",
+            "-name",
+            ".*",
+            "!",
+            "-path",
+            "./src/.*/*",
+            "!",
+            "-path",
+            "./src/*/.*/*",
+        ],
+    )
+
+
+def test_glob_to_find_expr_hidden_parts():
+    # A hidden directory named in the pattern is the start dir, not filtered
+    start_dir, args = runloop_protocol.glob_to_find_expr(".github/*.yml")
+    assert start_dir == "./.github"
+    assert "-path" not in args
+
+    start_dir, args = runloop_protocol.glob_to_find_expr(".github/**/*.yml")
+    assert start_dir == "./.github"
+    assert args[-6:] == ["!", "-path", "./.github/.*/*", "!", "-path", "./.github/*/.*/*"]
+
+    # A hidden file name is matched, but hidden directories below stay skipped
+    start_dir, args = runloop_protocol.glob_to_find_expr("**/.env")
+    assert start_dir == "."
+    assert ".*" not in args
+    assert "./.*/*" in args
+
+
+def test_glob_to_find_expr_falls_back():
+    for pattern in ["**", "a*/b.py", "../x.py", "a\\b/c.py", "a/**/b/*.py"]:
+        assert runloop_protocol.glob_to_find_expr(pattern) is None, pattern
+
+
+def make_protocol(**kwargs):
+    return runloop_protocol.RunloopProtocol(make_backend(), **kwargs)
+
+
+def test_grep_parses_paths_with_spaces_and_colons(tmp_path: Path):
+    (tmp_path / "a b.txt").write_text("needle\nhay\nneedle: again")
+    (tmp_path / "c:d.py").write_text("x = 'needle'")
+    (tmp_path / "e.txt").write_text("hay")
+    root = str(tmp_path)
+    proto = make_protocol()
+
+    matches = proto.grep_raw("needle", path=root)
+    assert sorted((m["path"], m["line"], m["text"]) for m in matches) == [
+        (f"{root}/a b.txt", 1, "needle"),
+        (f"{root}/a b.txt", 3, "needle: again"),
+        (f"{root}/c:d.py", 1, "x = 'needle'"),
+    ]
+    assert sorted(proto.grep_files("needle", path=root)) == [f"{root}/a b.txt", f"{root}/c:d.py"]
+    assert proto.grep_files("needle", path=root, glob="*.py") == [f"{root}/c:d.py"]
+    assert proto.grep_counts("needle", path=root) == {f"{root}/a b.txt": 2, f"{root}/c:d.py": 1}
+
+    # A file as the search path still reports its name
+    single = f"{root}/a b.txt"
+    assert proto.grep_counts("needle", path=single) == {single: 2}
+    assert proto.grep_files("needle", path=single) == [single]
+    assert [m["path"] for m in proto.grep_raw("needle", path=single)] == [single, single]
+
+
+def test_grep_without_matches_returns_empty_results(tmp_path: Path):
+    (tmp_path / "a.txt").write_text("hay")
+    root = str(tmp_path)
+    proto = make_protocol()
+
+    # grep exits with status 1 when nothing matches
+    assert proto.grep_raw("needle", path=root) == []
+    assert proto.grep_files("needle", path=root) == []
+    assert proto.grep_counts("needle", path=root) == {}
+    assert proto.grep_raw("needle", path=f"{root}/missing") == []
+
+
+def test_ls_parses_nul_separated_find_output(tmp_path: Path):
+    (tmp_path / "a b.txt").write_text("12345")
+    (tmp_path / "c:d").mkdir()
+    (tmp_path / "new\nline.txt").write_text("")
+    root = str(tmp_path)
+    proto = make_protocol(ls_cache_ttl=0)
+
+    infos = proto.ls_info(root)
+    assert [(fi["path"], fi["is_dir"], fi["size"]) for fi in infos] == [
+        (f"{root}/a b.txt", False, 5),
+        (f"{root}/c:d/", True, 0),
+        (f"{root}/new\nline.txt", False, 0),
+    ]
+    assert proto.ls_paths(root) == [f"{root}/a b.txt", f"{root}/c:d/", f"{root}/new\nline.txt"]
+    assert isinstance(proto, LsPathsBackendProtocol)
+    assert proto.ls_info(f"{root}/missing") == []
+
+
+def test_glob_caps_results(tmp_path: Path):
+    for name in ["a b.py", "c:d.py", "e.py", "f.txt"]:
+        (tmp_path / name).write_text("x")
+    root = str(tmp_path)
+
+    infos = make_protocol().glob_info("*.py", path=root)
+    assert [fi["path"] for fi in infos] == [f"{root}/a b.py", f"{root}/c:d.py", f"{root}/e.py"]
+    assert make_protocol().glob_info("*.md", path=root) == []
+
+    # Only real files come back, at most max_glob_results of them
+    capped = make_protocol(max_glob_results=2).glob_info("*.py", path=root)
+    assert len(capped) == 2
+    assert {fi["path"] for fi in capped} < {fi["path"] for fi in infos}
+    assert make_protocol(max_glob_results=3).glob_info("*.py", path=root) == infos
+
+
+def test_ls_cache_is_cleared_by_writes_and_edits(tmp_path: Path):
+    root = str(tmp_path)
+    (tmp_path / "sub").mkdir()
+    proto = make_protocol(ls_cache_ttl=3600)
+    assert proto.ls_paths(root) == [f"{root}/sub/"]
+    assert proto.ls_info(f"{root}/sub") == []
+
+    assert proto.write(f"{root}/a.txt", "hello").error is None
+    assert proto.ls_paths(root) == [f"{root}/a.txt", f"{root}/sub/"]
+
+    results = proto.write_many({f"{root}/sub/b.txt": "x", f"{root}/new/c.txt": "y"})
+    assert [r.error for r in results] == [None, None]
+    assert [fi["path"] for fi in proto.ls_info(f"{root}/sub")] == [f"{root}/sub/b.txt"]
+    assert proto.ls_paths(root) == [f"{root}/a.txt", f"{root}/new/", f"{root}/sub/"]
+
+    assert proto.edit(f"{root}/a.txt", "hello", "hello world").error is None
+    sizes = {fi["path"]: fi["size"] for fi in proto.ls_info(root)}
+    assert sizes[f"{root}/a.txt"] == len("hello world")
+
+    # Changes made by other means stay cached until invalidated
+    (tmp_path / "external.txt").write_text("")
+    assert f"{root}/external.txt" not in proto.ls_paths(root)
+    proto.invalidate_ls_cache()
+    assert f"{root}/external.txt" in proto.ls_paths(root)
+
+
+def test_ls_cache_normalizes_paths_and_returns_copies(tmp_path: Path):
+    root = str(tmp_path)
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.txt").write_text("x")
+    proto = make_protocol(ls_cache_ttl=3600)
+
+    listing = proto.ls_info(f"{root}/sub/")
+    assert listing == []
+    assert proto.ls_info(f"{root}/sub") == []
+    assert len(proto._ls_cache) == 1
+
+    # A write through a path with ".." still clears the listing it changes
+    assert proto.write(f"{root}/sub/../sub/b.txt", "y").error is None
+    assert [fi["path"] for fi in proto.ls_info(f"{root}/sub/")] == [f"{root}/sub/b.txt"]
+
+    # Mutating a returned entry leaves the cached one alone
+    proto.ls_info(root)[0]["path"] = "changed"
+    assert proto.ls_info(root)[0]["path"] == f"{root}/a.txt"
+
+
+def test_write_refuses_to_overwrite(tmp_path: Path):
+    existing = tmp_path / "a.txt"
+    existing.write_text("keep")
+    proto = make_protocol()
+
+    for content in ["small", "x" * (runloop_protocol._MAX_INLINE_WRITE_BYTES + 1)]:
+        res = proto.write(str(existing), content)
+        assert res.error is not None and "already exists" in res.error
+        assert existing.read_text() == "keep"
+
+
+def test_write_many_mixed_batch(tmp_path: Path):
+    root = str(tmp_path)
+    (tmp_path / "old.txt").write_text("keep")
+    (tmp_path / "blocker").write_text("not a directory")
+    large = "y" * (runloop_protocol._MAX_INLINE_WRITE_BYTES + 1)
+    proto = make_protocol()
+    devboxes = proto._backend._client.devboxes
+
+    results = proto.write_many(
+        {
+            f"{root}/new.txt": "fresh",
+            f"{root}/old.txt": "overwrite",
+            f"{root}/blocker/c.txt": "parent is a file",
+            f"{root}/large.txt": large,
+            f"{root}/nested/d.txt": "made with its parent",
+        }
+    )
+
+    assert [r.path for r in results] == [f"{root}/new.txt", None, None, f"{root}/large.txt", f"{root}/nested/d.txt"]
+    assert "already exists" in results[1].error
+    assert "Error writing file" in results[2].error
+    assert (tmp_path / "new.txt").read_text() == "fresh"
+    assert (tmp_path / "old.txt").read_text() == "keep"
+    assert (tmp_path / "large.txt").read_text() == large
+    assert (tmp_path / "nested" / "d.txt").read_text() == "made with its parent"
+    # The small files share one round-trip; the failed one and the large one
+    # each get an existence check before their upload
+    assert len(devboxes.commands) == 3
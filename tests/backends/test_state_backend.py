@@ -162,3 +162,25 @@ def test_state_backend_intercept_large_tool_result():
     assert "/large_tool_results/test_123" in result.update["files"]
     assert result.update["files"]["/large_tool_results/test_123"]["content"] == [large_content]
     assert "Tool result too large" in result.update["messages"][0].content
+
+
+def test_state_backend_glob_patterns():
+    rt = make_runtime()
+    be = StateBackend(rt)
+
+    for path in ["/c.py", "/a/b.py", "/src/main.py", "/src/notes.txt", "/src/pkg/mod.py"]:
+        res = be.write(path, "x")
+        assert res.error is None
+        rt.state["files"].update(res.files_update)
+
+    def glob_paths(pattern, path="/"):
+        return sorted(i["path"] for i in be.glob_info(pattern, path=path))
+
+    # Patterns without "/" match direct children only, except globstar
+    assert glob_paths("*.py") == ["/c.py"]
+    assert glob_paths("**") == ["/a/b.py", "/c.py", "/src/main.py", "/src/notes.txt", "/src/pkg/mod.py"]
+    assert glob_paths("**/*.py") == ["/a/b.py", "/c.py", "/src/main.py", "/src/pkg/mod.py"]
+    assert glob_paths("src/*.py") == ["/src/main.py"]
+    assert glob_paths("src/**/*.py") == ["/src/main.py", "/src/pkg/mod.py"]
+    assert glob_paths("*.py", path="/src") == ["/src/main.py"]
+    assert glob_paths("*.md") == []
@@ -41,6 +41,9 @@ def test_store_backend_crud_and_search():
     matches = be.grep_raw("hi", path="/")
     assert isinstance(matches, list) and any(m["path"] == "/docs/readme.md" for m in matches)
 
+    # invalid regex yields string error
+    assert isinstance(be.grep_raw("[", path="/"), str)
+
     # glob_info
     g = be.glob_info("*.md", path="/")
     assert len(g) == 0
@@ -136,3 +139,24 @@ def test_store_backend_intercept_large_tool_result():
     stored_content = rt.store.get(("filesystem",), "/large_tool_results/test_456")
     assert stored_content is not None
     assert stored_content.value["content"] == [large_content]
+
+
+def test_store_backend_glob_patterns():
+    rt = make_runtime()
+    be = StoreBackend(rt)
+
+    for path in ["/c.py", "/a/b.py", "/src/main.py", "/src/notes.txt", "/src/pkg/mod.py"]:
+        res = be.write(path, "x")
+        assert res.error is None
+
+    def glob_paths(pattern, path="/"):
+        return sorted(i["path"] for i in be.glob_info(pattern, path=path))
+
+    # Patterns without "/" match direct children only, except globstar
+    assert glob_paths("*.py") == ["/c.py"]
+    assert glob_paths("**") == ["/a/b.py", "/c.py", "/src/main.py", "/src/notes.txt", "/src/pkg/mod.py"]
+    assert glob_paths("**/*.py") == ["/a/b.py", "/c.py", "/src/main.py", "/src/pkg/mod.py"]
+    assert glob_paths("src/*.py") == ["/src/main.py"]
+    assert glob_paths("src/**/*.py") == ["/src/main.py", "/src/pkg/mod.py"]
+    assert glob_paths("*.py", path="/src") == ["/src/main.py"]
+    assert glob_paths("*.md") == []
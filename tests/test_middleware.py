@@ -589,6 +589,46 @@ class TestFilesystemMiddleware:
         )
         assert "Invalid regex pattern" in result
 
+    def test_grep_search_backend_files_and_counts_match_state_output(self, tmp_path):
+        from deepagents.backends import FilesystemBackend, GrepSummaryBackendProtocol, StateBackend
+
+        contents = {
+            "/test.py": ["import os", "import sys", "print('hello')"],
+            "/main.py": ["def main():", "    pass"],
+            "/sub/helper.txt": ["import json"],
+        }
+        for file_path, lines in contents.items():
+            target = tmp_path / file_path.lstrip("/")
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text("\n".join(lines))
+        state = FilesystemState(
+            messages=[],
+            files={
+                file_path: FileData(content=lines, modified_at="2021-01-01", created_at="2021-01-01")
+                for file_path, lines in contents.items()
+            },
+        )
+        runtime = ToolRuntime(state=state, context=None, tool_call_id="", store=None, stream_writer=lambda _: None, config={})
+        # FilesystemBackend answers files_with_matches and count through
+        # grep_files/grep_counts; StateBackend goes through grep_raw
+        fs_grep = next(
+            tool
+            for tool in FilesystemMiddleware(backend=FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)).tools
+            if tool.name == "grep"
+        )
+        state_grep = next(tool for tool in FilesystemMiddleware().tools if tool.name == "grep")
+        assert isinstance(FilesystemBackend(root_dir=str(tmp_path)), GrepSummaryBackendProtocol)
+        assert not isinstance(StateBackend(runtime), GrepSummaryBackendProtocol)
+
+        for output_mode in ["files_with_matches", "content", "count"]:
+            for pattern in ["import", "absent", "[invalid"]:
+                args = {"pattern": pattern, "output_mode": output_mode, "runtime": runtime}
+                assert fs_grep.invoke(args) == state_grep.invoke(args), (output_mode, pattern)
+
+        args = {"pattern": "import", "runtime": runtime}
+        assert fs_grep.invoke({**args, "output_mode": "files_with_matches"}) == "/sub/helper.txt\n/test.py"
+        assert fs_grep.invoke({**args, "output_mode": "count"}) == "/sub/helper.txt: 1\n/test.py: 2"
+
     def test_search_store_paginated_empty(self):
         """Test pagination with no items."""
         store = InMemoryStore()